@@ -6,11 +6,15 @@ class StudentNotInGroupError(frappe.ValidationError):
 	pass
 
 
-def validate_student_belongs_to_group(student, student_group):
-	groups = frappe.db.get_all(
-		"Student Group Student", ["parent"], dict(student=student, active=1)
-	)
-	if not student_group in [d.parent for d in groups]:
+def validate_student_belongs_to_group(student, student_group, groups=None):
+	if groups is None:
+		groups = [
+			d.parent
+			for d in frappe.db.get_all(
+				"Student Group Student", ["parent"], dict(student=student, active=1)
+			)
+		]
+	if not student_group in groups:
 		frappe.throw(
 			_("Student {0} does not belong to group {1}").format(
 				frappe.bold(student), frappe.bold(student_group)
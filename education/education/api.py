@@ -2,15 +2,26 @@
 # For license information, please see license.txt
 
 
+import hashlib
 import json
+import time
 
 import frappe
 from frappe import _
 from frappe.email.doctype.email_group.email_group import add_subscribers
 from frappe.model.mapper import get_mapped_doc
-from frappe.utils import cstr, flt, getdate
+from frappe.query_builder.functions import Max
+from frappe.utils import add_days, cint, cstr, flt, get_datetime, getdate
+from frappe.utils.background_jobs import enqueue
 from frappe.utils.dateutils import get_dates_from_timegrain
 
+from education.education.doctype.grading_scale.grading_scale import (
+	get_compiled_grading_scale,
+)
+from education.education.settings import get_education_settings
+
+ASSESSMENT_RESULT_SUBMIT_CHUNK_SIZE = 50
+
 
 def get_course(program):
 	"""Return list of courses for a particular program
@@ -98,34 +109,27 @@ def mark_attendance(
 	:param student_group: Student Group.
 	:param date: Date.
 	"""
-	if student_group:
-		academic_year = frappe.db.get_value("Student Group", student_group, "academic_year")
-		if academic_year:
-			year_start_date, year_end_date = frappe.db.get_value(
-				"Academic Year", academic_year, ["year_start_date", "year_end_date"]
-			)
-			if getdate(date) < getdate(year_start_date) or getdate(date) > getdate(
-				year_end_date
-			):
-				frappe.throw(
-					_("Attendance cannot be marked outside of Academic Year {0}").format(academic_year)
-				)
-
-	present = json.loads(students_present)
-	absent = json.loads(students_absent)
-
-	for d in present:
-		make_attendance_records(
-			d["student"], d["student_name"], "Present", course_schedule, student_group, date
-		)
+	from education.education.doctype.student_attendance.student_attendance import (
+		mark_bulk_attendance,
+	)
 
-	for d in absent:
-		make_attendance_records(
-			d["student"], d["student_name"], "Absent", course_schedule, student_group, date
-		)
+	students = [dict(d, status="Present") for d in json.loads(students_present)]
+	students += [dict(d, status="Absent") for d in json.loads(students_absent)]
+
+	summary = mark_bulk_attendance(students, course_schedule, student_group, date)
 
 	frappe.db.commit()
-	frappe.msgprint(_("Attendance has been marked successfully."))
+	if summary["rejected"]:
+		frappe.msgprint(
+			_("Attendance marked for {0} students, {1} rows were skipped:").format(
+				len(summary["created"]) + len(summary["updated"]), len(summary["rejected"])
+			)
+			+ "<br>"
+			+ "<br>".join(d["reason"] for d in summary["rejected"])
+		)
+	else:
+		frappe.msgprint(_("Attendance has been marked successfully."))
+	return summary
 
 
 def make_attendance_records(
@@ -251,34 +255,133 @@ def collect_fees(fees, amt):
 	return paid_amount
 
 
+COURSE_SCHEDULE_EVENTS_TTL = 60 * 60
+
+
 @frappe.whitelist()
-def get_course_schedule_events(start, end, filters=None):
+def get_course_schedule_events(start, end, filters=None, compress=0, etag=None):
 	"""Returns events for Course Schedule Calendar view rendering.
 
+	Results are cached per window against the Course Schedule version. Callers that
+	pass `compress` or an `etag` get `{"etag", "events"}`, or `{"etag", "series"}`
+	with `compress` set (see `compress_course_schedule_events`), and only
+	`{"etag", "not_modified": 1}` when their copy is still current.
+
 	:param start: Start date-time.
 	:param end: End date-time.
 	:param filters: Filters (JSON).
+	:param compress: Return weekly series instead of one event per schedule.
+	:param etag: `etag` of the copy the caller already holds.
 	"""
 	from frappe.desk.calendar import get_event_conditions
 
+	from education.education.doctype.course_schedule.course_schedule import (
+		get_course_schedule_version,
+	)
+
 	conditions = get_event_conditions("Course Schedule", filters)
+	compress = cint(compress)
+	key = hashlib.md5(
+		frappe.as_json([get_course_schedule_version(), start, end, conditions, compress]).encode()
+	).hexdigest()
+
+	if etag and etag == key:
+		return {"etag": key, "not_modified": 1}
+
+	data = frappe.cache().get_value("course_schedule_events|" + key)
+	if data is None:
+		data = get_course_schedule_event_rows(start, end, conditions)
+		if compress:
+			data = compress_course_schedule_events(data)
+		frappe.cache().set_value(
+			"course_schedule_events|" + key, data, expires_in_sec=COURSE_SCHEDULE_EVENTS_TTL
+		)
+
+	if compress:
+		return {"etag": key, "series": data}
+	if etag is not None:
+		return {"etag": key, "events": data}
+	return data
 
-	data = frappe.db.sql(
+
+def get_course_schedule_event_fields():
+	meta = frappe.get_meta("Course Schedule")
+	return [f for f in ("room", "student_group", "instructor") if meta.has_field(f)]
+
+
+def get_course_schedule_event_rows(start, end, conditions=""):
+	fields = "".join(", `{0}`".format(f) for f in get_course_schedule_event_fields())
+	return frappe.db.sql(
 		"""select name, course, color,
 			timestamp(schedule_date, from_time) as from_time,
-			timestamp(schedule_date, to_time) as to_time,
-			room, student_group, 0 as 'allDay'
+			timestamp(schedule_date, to_time) as to_time
+			{fields}, 0 as 'allDay'
 		from `tabCourse Schedule`
 		where ( schedule_date between %(start)s and %(end)s )
-		{conditions}""".format(
-			conditions=conditions
+		{conditions}
+		order by schedule_date, from_time""".format(
+			fields=fields, conditions=conditions
 		),
 		{"start": start, "end": end},
 		as_dict=True,
 		update={"allDay": 0},
 	)
 
-	return data
+
+def compress_course_schedule_events(events):
+	"""Folds flat calendar events into weekly series.
+
+	Events sharing course, color, room, student group, instructor, weekday and
+	times become one series running weekly from `start` to `until`, with the
+	weeks that have no event listed in `exceptions`. `names` holds the Course
+	Schedule of each remaining occurrence in date order.
+	`education.course_schedule.expand_series` turns series back into events.
+
+	:param events: Events as returned by `get_course_schedule_event_rows`.
+	"""
+	fields = get_course_schedule_event_fields()
+	series, seen = {}, {}
+	for event in events:
+		from_time, to_time = get_datetime(event.from_time), get_datetime(event.to_time)
+		key = (
+			event.course,
+			event.color,
+			*(event.get(f) for f in fields),
+			from_time.weekday(),
+			from_time.time(),
+			to_time.time(),
+		)
+		# identical schedules on the same day go to a parallel series
+		duplicates = seen.get((key, from_time.date()), 0)
+		seen[(key, from_time.date())] = duplicates + 1
+		series.setdefault((key, duplicates), []).append((from_time.date(), event.name))
+
+	out = []
+	for (key, duplicates), occurrences in series.items():
+		occurrences.sort()
+		dates = {d for d, name in occurrences}
+		start, until = occurrences[0][0], occurrences[-1][0]
+
+		exceptions = []
+		date = add_days(start, 7)
+		while date < until:
+			if date not in dates:
+				exceptions.append(str(date))
+			date = add_days(date, 7)
+
+		row = frappe._dict(zip(("course", "color", *fields), key))
+		row.update(
+			weekday=key[-3],
+			start_time=str(key[-2]),
+			end_time=str(key[-1]),
+			start=str(start),
+			until=str(until),
+			exceptions=exceptions,
+			names=[name for d, name in occurrences],
+		)
+		out.append(row)
+
+	return out
 
 
 @frappe.whitelist()
@@ -298,8 +401,37 @@ def get_assessment_criteria(course):
 @frappe.whitelist()
 def get_assessment_students(assessment_plan, student_group):
 	student_list = get_student_group_students(student_group)
-	for i, student in enumerate(student_list):
-		result = get_result(student.student, assessment_plan)
+	return set_assessment_results(student_list, assessment_plan)
+
+
+@frappe.whitelist()
+def get_assessment_students_page(assessment_plan, student_group, start=0, page_length=100):
+	"""Returns a page of students of the Student Group with their Assessment Results.
+
+	:param assessment_plan: Assessment Plan.
+	:param student_group: Student Group.
+	:param start: Offset of the first student.
+	:param page_length: Number of students in the page.
+	"""
+	start, page_length = cint(start), cint(page_length)
+	student_list = frappe.get_all(
+		"Student Group Student",
+		fields=["student", "student_name"],
+		filters={"parent": student_group, "active": 1},
+		order_by="group_roll_number",
+		limit_start=start,
+		limit_page_length=page_length,
+	)
+	return {
+		"students": set_assessment_results(student_list, assessment_plan),
+		"next_start": start + page_length if len(student_list) == page_length else None,
+	}
+
+
+def set_assessment_results(student_list, assessment_plan):
+	results = get_results([d.student for d in student_list], assessment_plan)
+	for student in student_list:
+		result = results.get(student.student)
 		if result:
 			student_result = {}
 			for d in result.details:
@@ -319,6 +451,43 @@ def get_assessment_students(assessment_plan, student_group):
 	return student_list
 
 
+def get_results(students, assessment_plan):
+	"""Returns Results of given students for specified Assessment Plan with their details, in two queries.
+
+	:param Students: List of Students
+	:param Assessment Plan: Assessment Plan
+	"""
+	if not students:
+		return {}
+
+	results = {}
+	for d in frappe.get_all(
+		"Assessment Result",
+		filters={
+			"student": ("in", students),
+			"assessment_plan": assessment_plan,
+			"docstatus": ("!=", 2),
+		},
+		fields=["name", "student", "total_score", "grade", "comment", "docstatus"],
+		order_by="modified desc",
+	):
+		if d.student not in results:
+			d.details = []
+			results[d.student] = d
+
+	results_by_name = {d.name: d for d in results.values()}
+	if results_by_name:
+		for d in frappe.get_all(
+			"Assessment Result Detail",
+			filters={"parent": ("in", list(results_by_name)), "parenttype": "Assessment Result"},
+			fields=["parent", "assessment_criteria", "maximum_score", "score", "grade"],
+			order_by="idx",
+		):
+			results_by_name[d.parent].details.append(d)
+
+	return results
+
+
 @frappe.whitelist()
 def get_assessment_details(assessment_plan):
 	"""Returns Assessment Criteria  and Maximum Score from Assessment Plan Master.
@@ -361,24 +530,19 @@ def get_grade(grading_scale, percentage):
 	:param Grading Scale: Grading Scale
 	:param Percentage: Score Percentage Percentage
 	"""
-	grading_scale_intervals = {}
-	if not hasattr(frappe.local, "grading_scale"):
-		grading_scale = frappe.get_all(
-			"Grading Scale Interval",
-			fields=["grade_code", "threshold"],
-			filters={"parent": grading_scale},
-		)
-		frappe.local.grading_scale = grading_scale
-	for d in frappe.local.grading_scale:
-		grading_scale_intervals.update({d.threshold: d.grade_code})
-	intervals = sorted(grading_scale_intervals.keys(), key=float, reverse=True)
-	for interval in intervals:
-		if flt(percentage) >= interval:
-			grade = grading_scale_intervals.get(interval)
-			break
-		else:
-			grade = ""
-	return grade
+	return get_compiled_grading_scale(grading_scale).get_grade(percentage)
+
+
+@frappe.whitelist()
+def get_grades(grading_scale, percentages):
+	"""Returns Grades for a list of Score Percentages in the same order.
+
+	:param Grading Scale: Grading Scale
+	:param Percentages: Score Percentages (JSON list)
+	"""
+	if isinstance(percentages, str):
+		percentages = json.loads(percentages)
+	return get_compiled_grading_scale(grading_scale).get_grades(percentages)
 
 
 @frappe.whitelist()
@@ -420,14 +584,144 @@ def mark_assessment_result(assessment_plan, scores):
 
 @frappe.whitelist()
 def submit_assessment_results(assessment_plan, student_group):
-	total_result = 0
-	student_list = get_student_group_students(student_group)
-	for i, student in enumerate(student_list):
-		doc = get_result(student.student, assessment_plan)
-		if doc and doc.docstatus == 0:
-			total_result += 1
-			doc.submit()
-	return total_result
+	"""Enqueues submission of the draft Assessment Results of the Student Group.
+
+	:param assessment_plan: Assessment Plan.
+	:param student_group: Student Group.
+	:returns: dict with `job_id` to poll with `get_assessment_result_submission_status`.
+	"""
+	frappe.has_permission("Assessment Result", "submit", throw=True)
+
+	job_id = frappe.generate_hash(length=12)
+	set_assessment_result_submission_status(
+		job_id, frappe._dict(status="Queued", total=0, submitted=0, failed=[])
+	)
+	enqueue(
+		submit_assessment_results_job,
+		queue="long",
+		timeout=3000,
+		now=frappe.flags.in_test,
+		submission_id=job_id,
+		assessment_plan=assessment_plan,
+		student_group=student_group,
+	)
+	return {"job_id": job_id}
+
+
+def submit_assessment_results_job(submission_id, assessment_plan, student_group):
+	"""Submits draft Assessment Results in chunks, committing after each chunk.
+
+	Results that fail validation are rolled back individually and reported in the
+	submission status instead of aborting the job. Any other error ends the job
+	with a `Failed` status carrying the error.
+	"""
+	status = frappe._dict(status="In Progress", total=0, submitted=0, failed=[])
+	try:
+		submit_draft_assessment_results(submission_id, assessment_plan, student_group, status)
+	except Exception as e:
+		if not frappe.flags.in_test:
+			frappe.db.rollback()
+		frappe.log_error(title=_("Assessment Result submission failed"))
+		status.update(status="Failed", error=cstr(e))
+	else:
+		status.status = "Completed"
+
+	set_assessment_result_submission_status(submission_id, status)
+
+
+def submit_draft_assessment_results(submission_id, assessment_plan, student_group, status):
+	students = [d.student for d in get_student_group_students(student_group)]
+	drafts = [d for d in get_results(students, assessment_plan).values() if d.docstatus == 0]
+	context = get_assessment_context(assessment_plan, students)
+
+	status.total = len(drafts)
+	set_assessment_result_submission_status(submission_id, status)
+
+	for i in range(0, len(drafts), ASSESSMENT_RESULT_SUBMIT_CHUNK_SIZE):
+		for result in drafts[i : i + ASSESSMENT_RESULT_SUBMIT_CHUNK_SIZE]:
+			frappe.db.savepoint("assessment_result")
+			try:
+				doc = frappe.get_doc("Assessment Result", result.name)
+				doc.flags.assessment_context = context
+				doc.submit()
+				status.submitted += 1
+			except Exception as e:
+				frappe.db.rollback(save_point="assessment_result")
+				frappe.clear_messages()
+				status.failed.append({"student": result.student, "error": cstr(e)})
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+		set_assessment_result_submission_status(submission_id, status)
+		frappe.publish_realtime(
+			"assessment_result_submission_progress",
+			{
+				"job_id": submission_id,
+				"progress": [status.submitted + len(status.failed), status.total],
+			},
+			user=frappe.session.user,
+		)
+
+
+def get_assessment_context(assessment_plan, students):
+	"""Prefetches what `AssessmentResult` validations need for the results of a plan.
+
+	:param assessment_plan: Assessment Plan.
+	:param students: List of Students.
+	"""
+	max_scores = {
+		d.assessment_criteria: d.maximum_score
+		for d in get_assessment_details(assessment_plan)
+	}
+
+	student_groups = {}
+	results = {}
+	if students:
+		for d in frappe.get_all(
+			"Student Group Student",
+			fields=["student", "parent"],
+			filters={"student": ("in", students), "active": 1},
+		):
+			student_groups.setdefault(d.student, []).append(d.parent)
+
+		for d in frappe.get_all(
+			"Assessment Result",
+			fields=["name", "student"],
+			filters={
+				"student": ("in", students),
+				"assessment_plan": assessment_plan,
+				"docstatus": ("!=", 2),
+			},
+		):
+			results.setdefault(d.student, []).append(d.name)
+
+	# compile the grading scale once for all results of the plan
+	get_compiled_grading_scale(
+		frappe.db.get_value("Assessment Plan", assessment_plan, "grading_scale")
+	)
+
+	return frappe._dict(
+		max_scores=max_scores, student_groups=student_groups, results=results
+	)
+
+
+@frappe.whitelist()
+def get_assessment_result_submission_status(job_id):
+	"""Returns the progress of a `submit_assessment_results` job.
+
+	:param job_id: Handle returned by `submit_assessment_results`.
+	"""
+	status = frappe.cache().get_value(f"assessment_result_submission|{job_id}")
+	if status and status.get("user") == frappe.session.user:
+		return status
+
+
+def set_assessment_result_submission_status(job_id, status):
+	status.user = frappe.session.user
+	frappe.cache().set_value(
+		f"assessment_result_submission|{job_id}", status, expires_in_sec=86400
+	)
 
 
 def get_assessment_result_doc(student, assessment_plan):
@@ -502,35 +796,116 @@ def get_instructors(student_group):
 
 @frappe.whitelist()
 def get_user_info():
+	return get_portal_bootstrap()["user"]
+
+
+@frappe.whitelist()
+def get_student_info():
+	data = get_portal_bootstrap()
+	if not data["student"]:
+		return
+
+	student_info = data["student"]
+	if data["current_program"]:
+		student_info["student_groups"] = data["student_groups"]
+		student_info["current_program"] = data["current_program"]
+	return student_info
+
+
+PORTAL_BOOTSTRAP_TTL = 10 * 60
+PORTAL_USER_FIELDS = ["name", "email", "enabled", "user_image", "full_name", "user_type"]
+PORTAL_STUDENT_FIELDS = [
+	"name",
+	"student_name",
+	"first_name",
+	"middle_name",
+	"last_name",
+	"user",
+	"student_email_id",
+	"student_mobile_number",
+	"joining_date",
+	"image",
+	"date_of_birth",
+	"blood_group",
+	"gender",
+	"nationality",
+	"address_line_1",
+	"address_line_2",
+	"city",
+	"state",
+	"country",
+	"postcode",
+	"customer",
+]
+
+
+@frappe.whitelist()
+def get_portal_bootstrap():
+	"""Returns the session user, student, current enrollment, student groups and school
+	branding the student portal needs at startup.
+
+	The payload is cached per user for `PORTAL_BOOTSTRAP_TTL` seconds and dropped
+	by `clear_portal_bootstrap` when any of the underlying documents change.
+	"""
 	if frappe.session.user == "Guest":
 		frappe.throw("Authentication failed", exc=frappe.AuthenticationError)
 
-	current_user = frappe.db.get_list(
-		"User",
-		fields=["name", "email", "enabled", "user_image", "full_name", "user_type"],
-		filters={"name": frappe.session.user},
-	)[0]
+	key = f"portal_bootstrap|{frappe.session.user}"
+	data = frappe.cache().get_value(key)
+	if data is None:
+		data = make_portal_bootstrap(frappe.session.user)
+		frappe.cache().set_value(key, data, expires_in_sec=PORTAL_BOOTSTRAP_TTL)
+
+	return data
+
+
+def make_portal_bootstrap(user):
+	current_user = frappe.db.get_value("User", user, PORTAL_USER_FIELDS, as_dict=True)
 	current_user["session_user"] = True
-	return current_user
 
+	data = {
+		"user": current_user,
+		"student": None,
+		"current_program": None,
+		"student_groups": [],
+		"school": get_school_abbr_logo(),
+	}
+	if user == "Administrator":
+		return data
 
-@frappe.whitelist()
-def get_student_info():
-	email = frappe.session.user
-	if email == "Administrator":
+	student = frappe.db.get_value("Student", {"user": user}, PORTAL_STUDENT_FIELDS, as_dict=True)
+	if not student:
+		return data
+
+	data["student"] = student
+	data["current_program"] = get_current_enrollment(student.name)
+	if data["current_program"]:
+		data["student_groups"] = get_student_groups(student.name, data["current_program"].program)
+
+	return data
+
+
+def clear_portal_bootstrap(users=None):
+	"""Drops cached portal bootstrap payloads of `users`, or of everyone if not given"""
+	if users is None:
+		frappe.cache().delete_keys("portal_bootstrap|")
 		return
-	student_info = frappe.db.get_list(
-		"Student",
-		fields=["*"],
-		filters={"user": email},
-	)[0]
-
-	current_program = get_current_enrollment(student_info.name)
-	if current_program:
-		student_groups = get_student_groups(student_info.name, current_program.program)
-		student_info["student_groups"] = student_groups
-		student_info["current_program"] = current_program
-	return student_info
+
+	for user in users:
+		if user:
+			frappe.cache().delete_value(f"portal_bootstrap|{user}")
+
+
+def clear_portal_bootstrap_for_students(students):
+	students = list(students)
+	if students:
+		clear_portal_bootstrap(
+			frappe.get_all("Student", filters={"name": ("in", students)}, pluck="user")
+		)
+
+
+def clear_portal_bootstrap_for_user(doc, method=None):
+	clear_portal_bootstrap([doc.name])
 
 
 @frappe.whitelist()
@@ -597,12 +972,69 @@ def get_course_schedule_for_student(program_name, student_groups):
 	return schedule
 
 
+STUDENT_TIMETABLE_PAGE_LENGTH = 100
+
+
 @frappe.whitelist()
-def apply_leave(leave_data, program_name):
-	attendance_based_on_course_schedule = frappe.db.get_single_value(
-		"Education Settings", "attendance_based_on_course_schedule"
+def get_student_timetable(
+	start=None, end=None, cursor=None, page_length=STUDENT_TIMETABLE_PAGE_LENGTH
+):
+	"""Returns a page of the session student's timetable from Student Timetable Entry.
+
+	Entries are ordered by date, start time and Course Schedule. A schedule attended
+	through more than one of the student's groups is returned once.
+
+	:param start: Window start date, defaults to today.
+	:param end: Window end date, defaults to a year after `start`.
+	:param cursor: `next_cursor` returned with the previous page.
+	:param page_length: Entries per page.
+	:return: `{"schedule": [...], "next_cursor": cursor or None}`
+	"""
+	student = frappe.db.get_value("Student", {"user": frappe.session.user})
+	if not student:
+		return {"schedule": [], "next_cursor": None}
+
+	page_length = min(cint(page_length) or STUDENT_TIMETABLE_PAGE_LENGTH, 500)
+	start = getdate(start)
+	values = {
+		"student": student,
+		"start": start,
+		"end": getdate(end) if end else add_days(start, 365),
+		"limit": page_length + 1,
+	}
+
+	cursor_condition = ""
+	if cursor:
+		values["cursor_date"], values["cursor_time"], values["cursor_name"] = json.loads(cursor)
+		cursor_condition = """and (schedule_date, from_time, course_schedule)
+			> (%(cursor_date)s, %(cursor_time)s, %(cursor_name)s)"""
+
+	schedule = frappe.db.sql(
+		"""select distinct course_schedule as name, title, course, schedule_date, from_time,
+			to_time, room, instructor, class_schedule_color
+		from `tabStudent Timetable Entry`
+		where student=%(student)s and schedule_date between %(start)s and %(end)s
+		{0}
+		order by schedule_date, from_time, course_schedule
+		limit %(limit)s""".format(
+			cursor_condition
+		),
+		values,
+		as_dict=True,
 	)
-	if attendance_based_on_course_schedule:
+
+	next_cursor = None
+	if len(schedule) > page_length:
+		schedule = schedule[:page_length]
+		last = schedule[-1]
+		next_cursor = json.dumps([str(last.schedule_date), str(last.from_time), last.name])
+
+	return {"schedule": schedule, "next_cursor": next_cursor}
+
+
+@frappe.whitelist()
+def apply_leave(leave_data, program_name):
+	if get_education_settings().attendance_based_on_course_schedule:
 		apply_leave_based_on_course_schedule(leave_data, program_name)
 	else:
 		apply_leave_based_on_student_group(leave_data, program_name)
@@ -656,10 +1088,25 @@ def apply_leave_based_on_student_group(leave_data, program_name):
 			)
 
 
+PORTAL_LOOKUP_TTL = 5 * 60
+
+_portal_lookup_cache = {}
+
+
 @frappe.whitelist()
-def get_student_invoices(student):
-	student_sales_invoices = []
+def get_student_invoices(student, start=0, page_length=None):
+	"""Returns submitted Sales Invoices of a student for the portal Fees page.
 
+	Invoices are ordered Overdue, Unpaid, Paid, then newest due date first. The page is built
+	from a fixed number of queries: the invoices, the programs of their Fee
+	Schedules and the payment dates of the paid ones.
+
+	:param student: Student
+	:param start: Offset of the page
+	:param page_length: Invoices per page, all invoices when not set
+	:return: `{"invoices", "print_format", "next_start"}`
+	"""
+	start, page_length = cint(start), cint(page_length)
 	sales_invoice_list = frappe.db.get_list(
 		"Sales Invoice",
 		filters={
@@ -676,23 +1123,36 @@ def get_student_invoices(student):
 			"grand_total",
 			"currency",
 		],
-		order_by="status desc",
+		order_by=(
+			"case `tabSales Invoice`.status when 'Overdue' then 0 when 'Unpaid' then 1 else 2 end,"
+			" `tabSales Invoice`.due_date desc, `tabSales Invoice`.name desc"
+		),
+		limit_start=start,
+		limit_page_length=page_length + 1 if page_length else 0,
+	)
+
+	next_start = None
+	if page_length and len(sales_invoice_list) > page_length:
+		sales_invoice_list = sales_invoice_list[:page_length]
+		next_start = start + page_length
+
+	programs = get_programs_from_fee_schedules(
+		{si.fee_schedule for si in sales_invoice_list if si.fee_schedule}
+	)
+	payment_dates = get_posting_dates_from_payment_entries_against_sales_invoices(
+		[si.name for si in sales_invoice_list if si.status == "Paid"]
 	)
 
+	student_sales_invoices = []
 	for si in sales_invoice_list:
 		student_program_invoice_status = {}
 		student_program_invoice_status["status"] = si.status
-		student_program_invoice_status["program"] = get_program_from_fee_schedule(
-			si.fee_schedule
-		)
-		symbol = get_currency_symbol(si.get("currency", "INR"))
+		student_program_invoice_status["program"] = programs.get(si.fee_schedule)
+		symbol = get_currency_symbol(si.get("currency") or "INR") or ""
 		student_program_invoice_status["amount"] = symbol + " " + str(si.grand_total)
-		# TODO: get currency
 		student_program_invoice_status["invoice"] = si.name
 		if si.status == "Paid":
-			student_program_invoice_status[
-				"payment_date"
-			] = get_posting_date_from_payment_entry_against_sales_invoice(si.name)
+			student_program_invoice_status["payment_date"] = payment_dates.get(si.name)
 			student_program_invoice_status["due_date"] = "-"
 		else:
 			student_program_invoice_status["due_date"] = si.due_date
@@ -702,14 +1162,43 @@ def get_student_invoices(student):
 
 	print_format = get_fees_print_format() or "Standard"
 
-	return {"invoices": student_sales_invoices, "print_format": print_format}
+	return {
+		"invoices": student_sales_invoices,
+		"print_format": print_format,
+		"next_start": next_start,
+	}
+
+
+def get_portal_lookup(key, getter):
+	"""Returns `getter()` cached in this process per site for `PORTAL_LOOKUP_TTL` seconds"""
+	cache_key = (frappe.local.site, key)
+	cached = _portal_lookup_cache.get(cache_key)
+	if cached and cached[0] > time.monotonic():
+		return cached[1]
+
+	value = getter()
+	_portal_lookup_cache[cache_key] = (time.monotonic() + PORTAL_LOOKUP_TTL, value)
+	return value
 
 
 def get_currency_symbol(currency):
-	return frappe.db.get_value("Currency", currency, "symbol")
+	return get_portal_lookup(
+		("currency_symbol", currency),
+		lambda: frappe.db.get_value("Currency", currency, "symbol"),
+	)
 
 
 def get_posting_date_from_payment_entry_against_sales_invoice(sales_invoice):
+	return get_posting_dates_from_payment_entries_against_sales_invoices([sales_invoice]).get(
+		sales_invoice
+	)
+
+
+def get_posting_dates_from_payment_entries_against_sales_invoices(sales_invoices):
+	"""Returns the latest submitted payment date keyed by Sales Invoice"""
+	if not sales_invoices:
+		return {}
+
 	payment_entry = frappe.qb.DocType("Payment Entry")
 	payment_entry_reference = frappe.qb.DocType("Payment Entry Reference")
 
@@ -717,20 +1206,41 @@ def get_posting_date_from_payment_entry_against_sales_invoice(sales_invoice):
 		frappe.qb.from_(payment_entry)
 		.inner_join(payment_entry_reference)
 		.on(payment_entry.name == payment_entry_reference.parent)
-		.select(payment_entry.posting_date)
-		.where(payment_entry_reference.reference_name == sales_invoice)
+		.select(
+			payment_entry_reference.reference_name, Max(payment_entry.posting_date).as_("posting_date")
+		)
+		.where(payment_entry_reference.reference_doctype == "Sales Invoice")
+		.where(payment_entry_reference.reference_name.isin(sales_invoices))
+		.where(payment_entry.docstatus == 1)
+		.groupby(payment_entry_reference.reference_name)
 	).run(as_dict=1)
 
-	if len(q) > 0:
-		payment_date = q[0].get("posting_date")
-		return payment_date
+	return {d.reference_name: d.posting_date for d in q}
 
 
 def get_fees_print_format():
-	return frappe.db.get_value(
-		"Property Setter",
-		dict(property="default_print_format", doc_type="Sales Invoice"),
-		"value",
+	return get_portal_lookup(
+		"fees_print_format",
+		lambda: frappe.db.get_value(
+			"Property Setter",
+			dict(property="default_print_format", doc_type="Sales Invoice"),
+			"value",
+		),
+	)
+
+
+def get_programs_from_fee_schedules(fee_schedules):
+	"""Returns the program of each Fee Schedule keyed by name"""
+	if not fee_schedules:
+		return {}
+
+	return dict(
+		frappe.get_all(
+			"Fee Schedule",
+			filters={"name": ("in", list(fee_schedules))},
+			fields=["name", "program"],
+			as_list=True,
+		)
 	)
 
 
@@ -744,18 +1254,89 @@ def get_program_from_fee_schedule(fee_schedule):
 
 @frappe.whitelist()
 def get_school_abbr_logo():
-	abbr = frappe.db.get_single_value(
-		"Education Settings", "school_college_name_abbreviation"
-	)
-	logo = frappe.db.get_single_value("Education Settings", "school_college_logo")
-	return {"name": abbr, "logo": logo}
+	settings = get_education_settings()
+	return {
+		"name": settings.school_college_name_abbreviation,
+		"logo": settings.school_college_logo,
+	}
 
 
 @frappe.whitelist()
 def get_student_attendance(student, student_group):
-	print(student, student_group, "student,student_group")
 	return frappe.db.get_list(
 		"Student Attendance",
 		filters={"student": student, "student_group": student_group, "docstatus": 1},
 		fields=["date", "status", "name"],
 	)
+
+
+@frappe.whitelist()
+def get_student_attendance_summary(
+	student, student_group, from_date=None, to_date=None, start=0, page_length=500
+):
+	"""Returns attendance counts of a student in a Student Group with a page of records.
+
+	Counts by status and by month are grouped in the database and records are
+	fetched one page at a time within the date window, all on the
+	(student, student_group, docstatus, date) index.
+
+	:param student: Student
+	:param student_group: Student Group
+	:param from_date: Start of the records window, unbounded if not set
+	:param to_date: End of the records window, unbounded if not set
+	:param start: Offset of the records page
+	:param page_length: Records per page
+	:return: `{"total", "by_status", "by_month", "records", "next_start"}`
+	"""
+	filters = {"student": student, "student_group": student_group, "docstatus": 1}
+	by_status = dict(
+		frappe.db.get_list(
+			"Student Attendance",
+			filters=filters,
+			fields=["status", "count(name) as count"],
+			group_by="status",
+			order_by="status",
+			as_list=True,
+		)
+	)
+
+	by_month = {}
+	for d in frappe.db.get_list(
+		"Student Attendance",
+		filters=filters,
+		fields=["year(date) as year", "month(date) as month", "status", "count(name) as count"],
+		group_by="year(date), month(date), status",
+		order_by="year(date), month(date)",
+	):
+		by_month.setdefault("{0}-{1:02d}".format(cint(d.year), cint(d.month)), {})[d.status] = d.count
+
+	record_filters = dict(filters)
+	if from_date and to_date:
+		record_filters["date"] = ["between", [getdate(from_date), getdate(to_date)]]
+	elif from_date:
+		record_filters["date"] = [">=", getdate(from_date)]
+	elif to_date:
+		record_filters["date"] = ["<=", getdate(to_date)]
+
+	start, page_length = cint(start), cint(page_length)
+	records = frappe.db.get_list(
+		"Student Attendance",
+		filters=record_filters,
+		fields=["name", "date", "status"],
+		order_by="date",
+		limit_start=start,
+		limit_page_length=page_length + 1 if page_length else 0,
+	)
+
+	next_start = None
+	if page_length and len(records) > page_length:
+		records = records[:page_length]
+		next_start = start + page_length
+
+	return {
+		"total": sum(by_status.values()),
+		"by_status": by_status,
+		"by_month": [dict(month=month, **counts) for month, counts in sorted(by_month.items())],
+		"records": records,
+		"next_start": next_start,
+	}
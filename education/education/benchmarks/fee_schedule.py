@@ -0,0 +1,77 @@
+# Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Benchmark for building fee records of a Fee Schedule.
+
+Compares the original path, which mapped the Fee Schedule once per student, with
+cloning a template built once by `make_fees_template`, on a synthetic list of
+students. Documents are only built, never saved, so the run does not write to the
+database.
+
+Usage:
+        bench --site <site> execute education.education.benchmarks.fee_schedule.run \\
+                --kwargs "{'fee_schedule': 'EDU-FSH-2024-00001'}"
+"""
+
+import time
+
+import frappe
+from frappe.model.mapper import get_mapped_doc
+
+from education.education.doctype.fee_schedule.fee_schedule import (
+	get_fees_table_map,
+	make_fees_template,
+)
+
+
+def run(fee_schedule, students=5000, doctype="Sales Invoice"):
+	"""Prints invoices per second before and after template caching.
+
+	:param fee_schedule: Fee Schedule to build records from.
+	:param students: Number of synthetic students.
+	:param doctype: Sales Invoice or Sales Order.
+	"""
+	student_ids = ["BENCH-STU-{0:05d}".format(i) for i in range(students)]
+
+	start = time.perf_counter()
+	for student_id in student_ids:
+		map_fees_doc(fee_schedule, doctype, student_id, student_id)
+	mapped = time.perf_counter() - start
+
+	start = time.perf_counter()
+	template = make_fees_template(fee_schedule, doctype)
+	for student_id in student_ids:
+		clone_fees_doc(template, student_id, student_id)
+	cloned = time.perf_counter() - start
+
+	result = {
+		"students": students,
+		"mapped_per_second": round(students / mapped, 2),
+		"template_per_second": round(students / cloned, 2),
+		"speedup": round(mapped / cloned, 2),
+	}
+	print(frappe.as_json(result))
+	return result
+
+
+def map_fees_doc(fee_schedule, doctype, student_id, customer):
+	"""Builds a fee record the way it was built before templates, by mapping the Fee
+	Schedule for every student."""
+	doc = get_mapped_doc(
+		"Fee Schedule",
+		fee_schedule,
+		get_fees_table_map(doctype),
+		ignore_permissions=True,
+	)
+	doc.student = student_id
+	doc.customer = customer
+	for item in doc.items:
+		item.qty = 1
+	return doc
+
+
+def clone_fees_doc(template, student_id, customer):
+	doc = frappe.copy_doc(template, ignore_no_copy=True)
+	doc.student = student_id
+	doc.customer = customer
+	return doc
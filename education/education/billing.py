@@ -7,6 +7,8 @@ from erpnext.accounts.doctype.journal_entry.journal_entry import (
 )
 from erpnext.accounts.doctype.payment_entry.test_payment_entry import get_payment_entry
 
+from education.education.settings import get_education_settings
+
 
 def get_details(docname):
 	details = frappe.db.get_value(
@@ -53,7 +55,7 @@ def get_payment_options(doctype, docname, phone, currency=None):
 	client = get_client()
 	order = create_order(client, details.grand_total, details.currency)
 	options = {
-		"key_id": frappe.db.get_single_value("Education Settings", "razorpay_key"),
+		"key_id": get_education_settings().razorpay_key,
 		"name": frappe.db.get_single_value("Website Settings", "app_name"),
 		"description": _("Payment for {0} course").format(details["grand_total"]),
 		"order_id": order["id"],
@@ -2,8 +2,31 @@
 # For license information, please see license.txt
 
 
+import frappe
 from frappe.model.document import Document
 
+ASSESSMENT_GROUP_VERSION_KEY = "assessment_group_tree_version"
+
 
 class AssessmentGroup(Document):
-	pass
+	def on_update(self):
+		clear_assessment_group_cache()
+
+	def on_trash(self):
+		clear_assessment_group_cache()
+
+	def after_rename(self, old, new, merge=False):
+		clear_assessment_group_cache()
+
+
+def get_assessment_group_version():
+	"""Returns a token that changes whenever the Assessment Group tree changes"""
+	version = frappe.cache().get_value(ASSESSMENT_GROUP_VERSION_KEY)
+	if not version:
+		version = frappe.generate_hash(length=10)
+		frappe.cache().set_value(ASSESSMENT_GROUP_VERSION_KEY, version)
+	return version
+
+
+def clear_assessment_group_cache():
+	frappe.cache().delete_value(ASSESSMENT_GROUP_VERSION_KEY)
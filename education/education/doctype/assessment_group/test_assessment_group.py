@@ -1,11 +1,30 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-
 from frappe.tests.utils import FrappeTestCase
 
+from education.education.report.course_wise_assessment_report import (
+	course_wise_assessment_report,
+)
+from education.education.test_utils import create_assessment_group
+
 # test_records = frappe.get_test_records('Assessment Group')
 
 
 class TestAssessmentGroup(FrappeTestCase):
-	pass
+	def test_child_assessment_groups_follow_tree_changes(self):
+		get_child_assessment_groups = course_wise_assessment_report.get_child_assessment_groups
+
+		parent = create_assessment_group("_Test Assessment Group Term", is_group=1)
+		create_assessment_group("_Test Assessment Group Midterm", parent)
+		self.assertEqual(get_child_assessment_groups(parent), ["_Test Assessment Group Midterm"])
+
+		create_assessment_group("_Test Assessment Group Final", parent)
+		self.assertEqual(
+			get_child_assessment_groups(parent),
+			["_Test Assessment Group Final", "_Test Assessment Group Midterm"],
+		)
+		self.assertEqual(
+			get_child_assessment_groups("_Test Assessment Group Final"),
+			["_Test Assessment Group Final"],
+		)
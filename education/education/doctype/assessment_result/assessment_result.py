@@ -9,23 +9,34 @@ from frappe.utils import flt
 from frappe.utils.csvutils import getlink
 
 import education.education
-from education.education.api import get_assessment_details, get_grade
+from education.education.api import get_assessment_details
+from education.education.doctype.grading_scale.grading_scale import (
+	get_compiled_grading_scale,
+)
 
 
 class AssessmentResult(Document):
+	# validations read from `flags.assessment_context` when it is set, see
+	# `education.education.api.get_assessment_context`
 	def validate(self):
+		context = self.flags.assessment_context
 		education.education.validate_student_belongs_to_group(
-			self.student, self.student_group
+			self.student,
+			self.student_group,
+			context.student_groups.get(self.student, []) if context else None,
 		)
 		self.validate_maximum_score()
 		self.validate_grade()
 		self.validate_duplicate()
 
 	def validate_maximum_score(self):
-		assessment_details = get_assessment_details(self.assessment_plan)
-		max_scores = {}
-		for d in assessment_details:
-			max_scores.update({d.assessment_criteria: d.maximum_score})
+		if self.flags.assessment_context:
+			max_scores = self.flags.assessment_context.max_scores
+		else:
+			assessment_details = get_assessment_details(self.assessment_plan)
+			max_scores = {}
+			for d in assessment_details:
+				max_scores.update({d.assessment_criteria: d.maximum_score})
 
 		for d in self.details:
 			d.maximum_score = max_scores.get(d.assessment_criteria)
@@ -33,24 +44,32 @@ class AssessmentResult(Document):
 				frappe.throw(_("Score cannot be greater than Maximum Score"))
 
 	def validate_grade(self):
-		self.total_score = 0.0
-		for d in self.details:
-			d.grade = get_grade(self.grading_scale, (flt(d.score) / d.maximum_score) * 100)
-			self.total_score += d.score
-		self.grade = get_grade(
-			self.grading_scale, (self.total_score / self.maximum_score) * 100
-		)
+		self.total_score = sum(flt(d.score) for d in self.details)
+		percentages = [(flt(d.score) / d.maximum_score) * 100 for d in self.details]
+		percentages.append((self.total_score / self.maximum_score) * 100)
+
+		grades = get_compiled_grading_scale(self.grading_scale).get_grades(percentages)
+		for d, grade in zip(self.details, grades):
+			d.grade = grade
+		self.grade = grades[-1]
 
 	def validate_duplicate(self):
-		assessment_result = frappe.get_list(
-			"Assessment Result",
-			filters={
-				"name": ("not in", [self.name]),
-				"student": self.student,
-				"assessment_plan": self.assessment_plan,
-				"docstatus": ("!=", 2),
-			},
-		)
+		if self.flags.assessment_context:
+			assessment_result = [
+				frappe._dict(name=name)
+				for name in self.flags.assessment_context.results.get(self.student, [])
+				if name != self.name
+			]
+		else:
+			assessment_result = frappe.get_list(
+				"Assessment Result",
+				filters={
+					"name": ("not in", [self.name]),
+					"student": self.student,
+					"assessment_plan": self.assessment_plan,
+					"docstatus": ("!=", 2),
+				},
+			)
 		if assessment_result:
 			frappe.throw(
 				_("Assessment Result record {0} already exists.").format(
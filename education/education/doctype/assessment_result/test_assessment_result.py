@@ -4,7 +4,7 @@
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
-from education.education.api import get_grade
+from education.education.api import get_grade, get_grades
 from education.education.test_utils import create_grading_scale
 
 # test_records = frappe.get_test_records('Assessment Result')
@@ -23,3 +23,12 @@ class TestAssessmentResult(FrappeTestCase):
 
 		grade = get_grade("_Test Grading Scale", 70)
 		self.assertEqual("B", grade)
+
+	def test_grades_for_multiple_scales(self):
+		create_grading_scale("_Test Pass Fail Scale", grades={"Pass": 40, "Fail": 0})
+
+		self.assertEqual(get_grade("_Test Grading Scale", 65), "C")
+		self.assertEqual(get_grade("_Test Pass Fail Scale", 65), "Pass")
+		self.assertEqual(
+			get_grades("_Test Grading Scale", [95, 80, 79.9, 50, 10]), ["A", "A", "B", "D", "F"]
+		)
@@ -1,6 +1,8 @@
 // Copyright (c) 2016, Frappe Technologies Pvt. Ltd. and contributors
 // For license information, please see license.txt
 
+// submission status is polled every 2 seconds for at most 30 minutes
+const MAX_SUBMISSION_POLLS = 900;
 
 frappe.ui.form.on('Assessment Result Tool', {
 	setup: function(frm) {
@@ -24,27 +26,37 @@ frappe.ui.form.on('Assessment Result Tool', {
 		if(frm.doc.assessment_plan) {
 			if (!frm.doc.student_group)
 				return
-			frappe.call({
-				method: "education.education.api.get_assessment_students",
-				args: {
-					"assessment_plan": frm.doc.assessment_plan,
-					"student_group": frm.doc.student_group
-				},
-				callback: function(r) {
-					if (r.message) {
-						frm.doc.students = r.message;
-						frm.events.render_table(frm);
-						for (let value of r.message) {
-							if (!value.docstatus) {
-								frm.doc.show_submit = true;
-								break;
-							}
+			frm.doc.students = [];
+			frm.events.get_students_page(frm, 0);
+		}
+	},
+
+	get_students_page: function(frm, start) {
+		frappe.call({
+			method: "education.education.api.get_assessment_students_page",
+			args: {
+				"assessment_plan": frm.doc.assessment_plan,
+				"student_group": frm.doc.student_group,
+				"start": start
+			},
+			callback: function(r) {
+				if (r.message) {
+					frm.doc.students = frm.doc.students.concat(r.message.students);
+					frm.events.render_table(frm);
+					for (let value of r.message.students) {
+						if (!value.docstatus) {
+							frm.doc.show_submit = true;
+							break;
 						}
+					}
+					if (r.message.next_start) {
+						frm.events.get_students_page(frm, r.message.next_start);
+					} else {
 						frm.events.submit_result(frm);
 					}
 				}
-			});
-		}
+			}
+		});
 	},
 
 	render_table: function(frm) {
@@ -170,12 +182,7 @@ frappe.ui.form.on('Assessment Result Tool', {
 						"student_group": frm.doc.student_group
 					},
 					callback: function(r) {
-						if (r.message) {
-							frappe.msgprint(__("{0} Result submittted", [r.message]));
-						} else {
-							frappe.msgprint(__("No Result to submit"));
-						}
-						frm.events.assessment_plan(frm);
+						frm.events.poll_submission(frm, r.message.job_id);
 					}
 				});
 			});
@@ -183,5 +190,60 @@ frappe.ui.form.on('Assessment Result Tool', {
 		else {
 			frm.page.clear_primary_action();
 		}
+	},
+
+	poll_submission: function(frm, job_id, attempt) {
+		attempt = attempt || 0;
+		frappe.call({
+			method: "education.education.api.get_assessment_result_submission_status",
+			args: {
+				"job_id": job_id
+			},
+			callback: function(r) {
+				let status = r.message;
+				let error;
+				if (!status) {
+					error = __("The submission status is no longer available. Reload the results to check which were submitted.");
+				} else if (status.status === "Failed") {
+					error = status.error || __("Submission failed, see the Error Log for details.");
+				} else if (status.status !== "Completed" && attempt >= MAX_SUBMISSION_POLLS) {
+					error = __("Results are still being submitted in the background. Reload the results later to check which were submitted.");
+				}
+				if (error) {
+					frappe.hide_progress();
+					frappe.msgprint({
+						title: __("Result Submission"),
+						message: error,
+						indicator: "red"
+					});
+					frm.events.assessment_plan(frm);
+					return;
+				}
+
+				if (status.status !== "Completed") {
+					if (status.total) {
+						frappe.show_progress(__("Submitting Results"),
+							status.submitted + status.failed.length, status.total);
+					}
+					setTimeout(() => frm.events.poll_submission(frm, job_id, attempt + 1), 2000);
+					return;
+				}
+
+				frappe.hide_progress();
+				if (status.submitted) {
+					frappe.msgprint(__("{0} Result submittted", [status.submitted]));
+				} else if (!status.failed.length) {
+					frappe.msgprint(__("No Result to submit"));
+				}
+				if (status.failed.length) {
+					frappe.msgprint({
+						title: __("{0} Results could not be submitted", [status.failed.length]),
+						message: status.failed.map(d => `${d.student}: ${d.error}`).join("<br>"),
+						indicator: "red"
+					});
+				}
+				frm.events.assessment_plan(frm);
+			}
+		});
 	}
 });
@@ -7,13 +7,21 @@ from functools import reduce
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import get_link_to_form
+from frappe.utils import cstr, get_link_to_form
+
+from education.education.utils import clear_lms_context_for_students
 
 
 class CourseEnrollment(Document):
 	def validate(self):
 		self.validate_duplication()
 
+	def after_insert(self):
+		clear_lms_context_for_students([self.student])
+
+	def on_trash(self):
+		clear_lms_context_for_students([self.student])
+
 	def get_progress(self, student):
 		"""
 		Returns Progress of given student for a particular course enrollment
@@ -52,6 +60,9 @@ class CourseEnrollment(Document):
 	def add_quiz_activity(
 		self, quiz_name, quiz_response, answers, score, status, time_taken
 	):
+		from education.education.doctype.quiz.quiz import get_answer_key
+
+		labels = get_answer_key(quiz_name)["labels"]
 		result = {k: ("Correct" if v else "Wrong") for k, v in answers.items()}
 		result_data = []
 		for key in answers:
@@ -63,10 +74,10 @@ class CourseEnrollment(Document):
 					item["selected_option"] = "Unattempted"
 				elif isinstance(quiz_response[key], list):
 					item["selected_option"] = ", ".join(
-						frappe.get_value("Options", res, "option") for res in quiz_response[key]
+						cstr(labels.get(res)) for res in quiz_response[key]
 					)
 				else:
-					item["selected_option"] = frappe.get_value("Options", quiz_response[key], "option")
+					item["selected_option"] = labels.get(quiz_response[key])
 			except KeyError:
 				item["selected_option"] = "Unattempted"
 			result_data.append(item)
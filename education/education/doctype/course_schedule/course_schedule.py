@@ -4,6 +4,12 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from education.education.doctype.student_timetable_entry.student_timetable_entry import (
+    update_timetable_for_schedules,
+)
+
+COURSE_SCHEDULE_VERSION_KEY = "course_schedule_version"
+
 
 class CourseSchedule(Document):
     def validate(self):
@@ -15,6 +21,16 @@ class CourseSchedule(Document):
     def before_save(self):
         self.set_hex_color()
 
+    def on_update(self):
+        clear_course_schedule_cache()
+        update_timetable_for_schedules([self.name])
+
+    def on_trash(self):
+        clear_course_schedule_cache()
+
+    def after_delete(self):
+        update_timetable_for_schedules([self.name])
+
     def set_title(self):
         """Set document Title"""
         self.title = self.course
@@ -70,3 +86,16 @@ class CourseSchedule(Document):
             "purple": "#F9F0FF",
         }
         self.color = colors[self.class_schedule_color or "green"]
+
+
+def get_course_schedule_version():
+    """Returns a token that changes whenever any Course Schedule changes"""
+    version = frappe.cache().get_value(COURSE_SCHEDULE_VERSION_KEY)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(COURSE_SCHEDULE_VERSION_KEY, version)
+    return version
+
+
+def clear_course_schedule_cache():
+    frappe.cache().delete_value(COURSE_SCHEDULE_VERSION_KEY)
@@ -34,5 +34,11 @@ frappe.views.calendar["Course Schedule"] = {
 			"label": __("Room")
 		}
 	],
-	get_events_method: "education.education.api.get_course_schedule_events"
+	get_events_method: "education.education.api.get_course_schedule_events",
+	get_args: function(start, end) {
+		return education.course_schedule.get_calendar_args(this, start, end);
+	},
+	prepare_events: function(data) {
+		return education.course_schedule.prepare_calendar_events(this, data);
+	}
 }
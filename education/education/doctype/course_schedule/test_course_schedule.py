@@ -8,7 +8,8 @@ import frappe
 from frappe.utils import to_timedelta, today
 from frappe.utils.data import add_to_date
 from frappe.tests.utils import FrappeTestCase
-from education.education.utils import OverlapError
+from education.education.api import compress_course_schedule_events
+from education.education.utils import OverlapError, get_overlaps
 from education.education.test_utils import (
 	create_academic_year,
 	create_academic_term,
@@ -103,6 +104,40 @@ class TestCourseSchedule(FrappeTestCase):
 		doc.schedule_date = add_to_date(doc.schedule_date, days=1)
 		doc.save()
 
+	def test_batch_overlaps(self):
+		room = frappe.get_all("Room")[0].name
+		slots = [
+			{"room": room, "schedule_date": "2023-08-01", "from_time": "09:00", "to_time": "10:00"},
+			{"room": room, "schedule_date": "2023-08-01", "from_time": "09:30", "to_time": "10:30"},
+			{"room": room, "schedule_date": "2023-08-01", "from_time": "10:30", "to_time": "11:30"},
+			{"room": room, "schedule_date": "2023-08-02", "from_time": "09:00", "to_time": "10:00"},
+		]
+		conflicts = get_overlaps(slots, "Assessment Plan")
+
+		self.assertEqual(sorted(conflicts), [0, 1])
+		self.assertEqual(conflicts[0][0].fieldname, "room")
+		self.assertEqual(conflicts[0][0].candidate, 1)
+		self.assertEqual(conflicts[1][0].candidate, 0)
+
+	def test_compress_course_schedule_events(self):
+		events = [
+			frappe._dict(
+				name="CS-{0}".format(i),
+				course="Test Course",
+				color="#EDF6FD",
+				from_time=datetime.datetime(2023, 8, 7 + 7 * i, 9),
+				to_time=datetime.datetime(2023, 8, 7 + 7 * i, 10),
+			)
+			for i in (0, 1, 3)
+		]
+		series = compress_course_schedule_events(events)
+
+		self.assertEqual(len(series), 1)
+		self.assertEqual(series[0].start, "2023-08-07")
+		self.assertEqual(series[0].until, "2023-08-28")
+		self.assertEqual(series[0].exceptions, ["2023-08-21"])
+		self.assertEqual(series[0].names, ["CS-0", "CS-1", "CS-3"])
+
 
 def make_course_schedule_test_record(**args):
 	args = frappe._dict(args)
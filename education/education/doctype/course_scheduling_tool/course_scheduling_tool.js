@@ -24,29 +24,51 @@ frappe.ui.form.on('Course Scheduling Tool', {
 					if (!r.message) {
 						frappe.throw(__('There were errors creating Course Schedule'));
 					}
-					const { course_schedules } = r.message;
-					if (course_schedules) {
-						const course_schedules_html = course_schedules.map(c => `
-							<tr>
-								<td><a href="/app/course-schedule/${c.name}">${c.name}</a></td>
-								<td>${c.schedule_date}</td>
-							</tr>
-						`).join('');
-
-						const html = `
-							<table class="table table-bordered">
-								<caption>${__('Following course schedules were created')}</caption>
-								<thead><tr><th>${__("Course")}</th><th>${__("Date")}</th></tr></thead>
-								<tbody>
-									${course_schedules_html}
-								</tbody>
-							</table>
-						`;
-
-						frappe.msgprint(html);
+					if (r.message.queued) {
+						frappe.msgprint(__("{0} course schedules will be created in the background.", [r.message.total]));
+						return;
 					}
+					frm.events.show_course_schedules(r.message);
 				});
 		});
+
+		frappe.realtime.off("course_scheduling_progress");
+		frappe.realtime.on("course_scheduling_progress", (data) => {
+			frappe.show_progress(__("Scheduling Course"), data.progress, 100);
+			if (data.summary) {
+				frappe.hide_progress();
+				frm.events.show_course_schedules(JSON.parse(data.summary));
+			}
+		});
+	},
+	show_course_schedules(summary) {
+		const { course_schedules, course_schedules_errors } = summary;
+		let html = "";
+		if (course_schedules && course_schedules.length) {
+			const course_schedules_html = course_schedules.map(c => `
+				<tr>
+					<td><a href="/app/course-schedule/${c.name}">${c.name}</a></td>
+					<td>${c.schedule_date}</td>
+				</tr>
+			`).join('');
+
+			html += `
+				<table class="table table-bordered">
+					<caption>${__('Following course schedules were created')}</caption>
+					<thead><tr><th>${__("Course")}</th><th>${__("Date")}</th></tr></thead>
+					<tbody>
+						${course_schedules_html}
+					</tbody>
+				</table>
+			`;
+		}
+		if (course_schedules_errors && course_schedules_errors.length) {
+			html += `<p>${__("Course schedules could not be created for the following dates due to conflicts: {0}",
+				[course_schedules_errors.join(", ")])}</p>`;
+		}
+		if (html) {
+			frappe.msgprint(html);
+		}
 	},
 	render_days: function(frm) {
 		const days_html = $('<div class="days-editor">').appendTo(
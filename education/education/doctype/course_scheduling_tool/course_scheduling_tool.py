@@ -1,47 +1,64 @@
-from datetime import datetime, timedelta
 import calendar
 import frappe
+from erpnext import get_default_company
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import add_days, getdate
+from frappe.utils import add_days, date_diff, getdate, now
+from frappe.utils.background_jobs import enqueue
+
+from education.education.doctype.course_schedule.course_schedule import (
+    clear_course_schedule_cache,
+)
+from education.education.doctype.student_timetable_entry.student_timetable_entry import (
+    update_timetable_for_schedules,
+)
+from education.education.utils import get_overlaps, make_series_names
+
+SCHEDULE_INSERT_BATCH_SIZE = 200
+BACKGROUND_SCHEDULING_THRESHOLD = 60
 
-from education.education.utils import OverlapError
 
 class CourseSchedulingTool(Document):
     @frappe.whitelist()
     def schedule_course(self, days):
-        """Creates course schedules as per specified parameters"""
-
-        course_schedules = []
-        course_schedules_errors = []
-        rescheduled = []
-        reschedule_errors = []
+        """Creates course schedules as per specified parameters.
 
+        Long date ranges are scheduled in a background job that publishes
+        `course_scheduling_progress` and the final summary over realtime.
+        """
         self.validate_mandatory(days)
         self.validate_date()
+        frappe.has_permission("Course Schedule", "create", throw=True)
 
-        date = self.start_date
-        while date <= self.end_date:
-            if calendar.day_name[getdate(date).weekday()] in days:
-                course_schedule = frappe.new_doc("Course Schedule")
-                course_schedule.course = self.course
-                course_schedule.schedule_date = date
-                course_schedule.from_time = self.from_time
-                course_schedule.to_time = self.to_time
-                try:
-                    course_schedule.insert()
-                except OverlapError:
-                    course_schedules_errors.append(date)
-                else:
-                    course_schedules.append(course_schedule)
-            date += timedelta(days=1)
-
-        return dict(
-            course_schedules=course_schedules,
-            course_schedules_errors=course_schedules_errors,
-            rescheduled=rescheduled,
-            reschedule_errors=reschedule_errors,
-        )
+        dates = self.get_schedule_dates(days)
+        if len(dates) > BACKGROUND_SCHEDULING_THRESHOLD:
+            enqueue(
+                make_course_schedules,
+                queue="long",
+                timeout=3000,
+                event="schedule_course",
+                now=frappe.flags.in_test,
+                tool=self.as_dict(),
+                dates=dates,
+                publish_progress=True,
+            )
+            return dict(queued=True, total=len(dates))
+
+        return make_course_schedules(self.as_dict(), dates)
+
+    def get_schedule_dates(self, days):
+        """Returns dates between Start Date and End Date falling on the selected days,
+        excluding holidays of the default company's holiday list"""
+        start_date, end_date = getdate(self.start_date), getdate(self.end_date)
+        holidays = set(get_holidays(start_date, end_date))
+
+        dates = []
+        for i in range(date_diff(end_date, start_date) + 1):
+            date = add_days(start_date, i)
+            if calendar.day_name[date.weekday()] in days and date not in holidays:
+                dates.append(date)
+
+        return dates
 
     def validate_mandatory(self, days):
         """Validates all mandatory fields"""
@@ -63,3 +80,125 @@ class CourseSchedulingTool(Document):
         """Validates if Start Date is greater than End Date"""
         if self.start_date > self.end_date:
             frappe.throw(_("Start Date cannot be greater than End Date."))
+
+
+def get_holidays(start_date, end_date, company=None):
+    """Returns holiday dates of the company's default holiday list within the range"""
+    company = company or get_default_company()
+    holiday_list = company and frappe.get_cached_value(
+        "Company", company, "default_holiday_list"
+    )
+    if not holiday_list:
+        return []
+
+    return frappe.get_all(
+        "Holiday",
+        filters={"parent": holiday_list, "holiday_date": ("between", [start_date, end_date])},
+        pluck="holiday_date",
+    )
+
+
+def make_course_schedules(tool, dates, publish_progress=False):
+    """Creates Course Schedules for the tool's course on every given date.
+
+    The first schedule is validated as a regular document and used as a template
+    for the others, which differ only by date. Dates conflicting with existing
+    schedules are checked in one pass and reported as errors, the rest are
+    written with multi-row inserts.
+
+    :param tool: Course Scheduling Tool values
+    :param dates: Candidate schedule dates
+    :param publish_progress: Publish `course_scheduling_progress` while inserting
+    """
+    tool = frappe._dict(tool)
+    template = make_course_schedule_template(tool, dates[0] if dates else tool.start_date)
+
+    slots = [
+        dict(
+            schedule_date=date,
+            from_time=tool.from_time,
+            to_time=tool.to_time,
+            room=tool.room,
+            instructor=tool.instructor,
+            student_group=tool.student_group,
+        )
+        for date in dates
+    ]
+    conflicts = get_overlaps(slots, "Course Schedule")
+
+    course_schedules = []
+    course_schedules_errors = [date for idx, date in enumerate(dates) if idx in conflicts]
+    to_insert = [date for idx, date in enumerate(dates) if idx not in conflicts]
+
+    if to_insert:
+        values = template.get_valid_dict(convert_dates_to_str=True)
+        fields = list(values)
+        names = make_series_names(template.naming_series, len(to_insert))
+        timestamp, user = now(), frappe.session.user
+
+        for start in range(0, len(to_insert), SCHEDULE_INSERT_BATCH_SIZE):
+            rows = []
+            for name, date in zip(
+                names[start : start + SCHEDULE_INSERT_BATCH_SIZE],
+                to_insert[start : start + SCHEDULE_INSERT_BATCH_SIZE],
+            ):
+                values.update(
+                    name=name,
+                    schedule_date=str(date),
+                    creation=timestamp,
+                    modified=timestamp,
+                    owner=user,
+                    modified_by=user,
+                )
+                rows.append([values[f] for f in fields])
+                course_schedules.append(dict(name=name, schedule_date=date))
+
+            frappe.db.bulk_insert("Course Schedule", fields=fields, values=rows)
+
+            if publish_progress:
+                frappe.publish_realtime(
+                    "course_scheduling_progress",
+                    {"progress": int(len(course_schedules) * 100 / len(to_insert))},
+                    user=frappe.session.user,
+                )
+
+        clear_course_schedule_cache()
+        update_timetable_for_schedules(d["name"] for d in course_schedules)
+
+    summary = dict(
+        course_schedules=course_schedules,
+        course_schedules_errors=course_schedules_errors,
+        rescheduled=[],
+        reschedule_errors=[],
+    )
+    if publish_progress:
+        frappe.publish_realtime(
+            "course_scheduling_progress",
+            {"progress": 100, "summary": frappe.as_json(summary)},
+            user=frappe.session.user,
+        )
+
+    return summary
+
+
+def make_course_schedule_template(tool, schedule_date):
+    """Returns a validated, unsaved Course Schedule carrying the tool's values"""
+    course_schedule = frappe.new_doc("Course Schedule")
+    course_schedule.schedule_date = schedule_date
+    for fieldname in (
+        "course",
+        "from_time",
+        "to_time",
+        "class_schedule_color",
+        "room",
+        "instructor",
+        "student_group",
+    ):
+        if course_schedule.meta.has_field(fieldname):
+            course_schedule.set(fieldname, tool.get(fieldname))
+
+    course_schedule.run_method("validate")
+    course_schedule.run_method("before_save")
+    course_schedule._validate_links()
+
+    return course_schedule
@@ -1,9 +1,66 @@
 # Copyright (c) 2017, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-
+import frappe
+from erpnext import get_default_company
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from education.education.test_utils import create_course, create_room
 
 
 class TestCourseSchedulingTool(FrappeTestCase):
-	pass
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_schedule_dates(self):
+		tool = frappe.get_doc(
+			{
+				"doctype": "Course Scheduling Tool",
+				"start_date": "2023-08-01",
+				"end_date": "2023-08-14",
+			}
+		)
+		dates = tool.get_schedule_dates(["Monday", "Wednesday"])
+
+		self.assertTrue(all(d.weekday() in (0, 2) for d in dates))
+		self.assertTrue(all(getdate("2023-08-01") <= d <= getdate("2023-08-14") for d in dates))
+
+	def test_holidays_are_not_scheduled(self):
+		create_course()
+		create_room()
+		holiday_list = frappe.get_doc(
+			{
+				"doctype": "Holiday List",
+				"holiday_list_name": "_Test Course Scheduling Holidays",
+				"from_date": "2023-08-01",
+				"to_date": "2023-08-31",
+				"holidays": [{"holiday_date": "2023-08-09", "description": "Test Holiday"}],
+			}
+		).insert()
+		frappe.db.set_value(
+			"Company", get_default_company(), "default_holiday_list", holiday_list.name
+		)
+
+		tool = frappe.get_doc(
+			{
+				"doctype": "Course Scheduling Tool",
+				"course": frappe.db.get_value("Course", {"course_name": "Test Course"}),
+				"room": frappe.db.get_value("Room", {"room_name": "Test Room"}),
+				"from_time": "10:00:00",
+				"to_time": "11:00:00",
+				"start_date": "2023-08-01",
+				"end_date": "2023-08-14",
+			}
+		)
+		summary = tool.schedule_course(["Monday", "Wednesday"])
+
+		scheduled = [getdate(d["schedule_date"]) for d in summary["course_schedules"]]
+		self.assertEqual(
+			scheduled, [getdate("2023-08-02"), getdate("2023-08-07"), getdate("2023-08-14")]
+		)
+		self.assertFalse(
+			frappe.db.exists(
+				"Course Schedule", {"course": tool.course, "schedule_date": "2023-08-09"}
+			)
+		)
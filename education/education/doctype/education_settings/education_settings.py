@@ -6,6 +6,9 @@ import frappe
 import frappe.defaults
 from frappe.model.document import Document
 
+from education.education.api import clear_portal_bootstrap
+from education.education.settings import clear_education_settings_cache
+
 education_keydict = {
 	# "key in defaults": "key in Global Defaults"
 	"academic_year": "current_academic_year",
@@ -22,6 +25,8 @@ class EducationSettings(Document):
 			frappe.db.set_default(key, self.get(education_keydict[key], ""))
 
 		# clear cache
+		clear_education_settings_cache()
+		clear_portal_bootstrap()
 		frappe.clear_cache()
 
 	def get_defaults(self):
@@ -125,6 +125,18 @@ frappe.ui.form.on("Fee Schedule", {
 				}
 			});
 		}
+		if (frm.doc.docstatus === 1 && frm.doc.status === "Failed") {
+			frm.add_custom_button(__("Resume Fee Creation"), function () {
+				frappe.call({
+					method: "create_fees",
+					doc: frm.doc,
+					args: { resume: 1 },
+					callback: function () {
+						frm.refresh();
+					},
+				});
+			});
+		}
 	},
 
 	fee_structure: function (frm) {
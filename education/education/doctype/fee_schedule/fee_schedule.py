@@ -2,14 +2,23 @@
 # For license information, please see license.txt
 
 
+import time
+
 import erpnext
 import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.model.mapper import get_mapped_doc
-from frappe.utils import cint, cstr, flt, money_in_words
+from frappe.utils import cint, cstr, flt, money_in_words, now
 from frappe.utils.background_jobs import enqueue
 
+from education.education.settings import get_education_settings
+from education.education.utils import make_series_names
+
+FEE_GENERATION_CHUNK_SIZE = 100
+CUSTOMER_BATCH_SIZE = 100
+# minimum seconds between two realtime progress updates of a chunk
+PROGRESS_PUBLISH_INTERVAL = 2
 
 # TODO: on cancel delete all the fees / Sales Invoice created from this fee schedule
 
@@ -30,7 +39,7 @@ class FeeSchedule(Document):
 		if self.docstatus == 0:
 			status = "Draft"
 		elif self.docstatus == 1:
-			if frappe.db.get_single_value("Education Settings", "create_so"):
+			if get_education_settings().create_so:
 				status = "Order Pending"
 			else:
 				status = "Invoice Pending"
@@ -61,32 +70,51 @@ class FeeSchedule(Document):
 		self.calculate_total_and_program()
 
 	def calculate_total_and_program(self):
-		no_of_students = 0
-		for d in self.student_groups:
-			# if not d.total_students:
-			d.total_students = get_total_students(
-				d.student_group,
+		if self.student_counts_changed():
+			student_counts = get_student_counts(
+				[d.student_group for d in self.student_groups],
 				self.academic_year,
 				self.academic_term,
 				self.student_category,
 			)
-			no_of_students += cint(d.total_students)
-
-			# validate the program of fee structure and student groups
-			student_group_program = frappe.db.get_value(
-				"Student Group", d.student_group, "program"
-			)
-			if self.program and student_group_program and self.program != student_group_program:
-				frappe.msgprint(
-					_("Program in the Fee Structure and Student Group {0} are different.").format(
-						d.student_group
+			for d in self.student_groups:
+				group = student_counts.get(d.student_group) or frappe._dict()
+				d.total_students = cint(group.total_students)
+
+				# validate the program of fee structure and student groups
+				if self.program and group.program and self.program != group.program:
+					frappe.msgprint(
+						_("Program in the Fee Structure and Student Group {0} are different.").format(
+							d.student_group
+						)
 					)
-				)
+
+		no_of_students = sum(cint(d.total_students) for d in self.student_groups)
 		self.grand_total = no_of_students * self.total_amount
 		self.grand_total_in_words = money_in_words(self.grand_total)
 
+	def student_counts_changed(self):
+		"""Student counts are recomputed for new and submitted schedules and whenever the
+		student groups or the filters applied to their students change."""
+		doc_before_save = self.get_doc_before_save()
+		if self.is_new() or self.docstatus == 1 or not doc_before_save:
+			return True
+
+		if any(
+			self.has_value_changed(fieldname)
+			for fieldname in ("academic_year", "academic_term", "student_category")
+		):
+			return True
+
+		if any(not d.total_students for d in self.student_groups):
+			return True
+
+		return [d.student_group for d in self.student_groups] != [
+			d.student_group for d in doc_before_save.student_groups
+		]
+
 	@frappe.whitelist()
-	def create_fees(self):
+	def create_fees(self, resume=False):
 		self.db_set("status", "In Process")
 
 		frappe.publish_realtime(
@@ -105,62 +133,178 @@ class FeeSchedule(Document):
 			)
 			enqueue(
 				generate_fees,
-				queue="default",
+				queue="long",
 				timeout=6000,
 				event="generate_fees",
 				fee_schedule=self.name,
+				resume=cint(resume),
+				run_in_background=True,
 			)
 		else:
-			generate_fees(self.name)
+			generate_fees(self.name, resume=cint(resume))
+
 
+def generate_fees(fee_schedule, resume=False, run_in_background=False):
+	"""Creates Sales Invoices or Sales Orders for all students of the Fee Schedule.
 
-def generate_fees(fee_schedule):
+	Missing customers are provisioned first, then students are split into chunks of
+	`FEE_GENERATION_CHUNK_SIZE`, tracked as Fee Schedule Chunk rows. Each chunk is
+	committed on its own, so a failure only rolls back its chunk.
 
+	:param fee_schedule: Fee Schedule.
+	:param resume: Skip students who already have an invoice or order for the schedule.
+	:param run_in_background: Enqueue one job per chunk instead of processing them inline.
+	"""
 	doc = frappe.get_doc("Fee Schedule", fee_schedule)
-	error = False
-	create_so = frappe.db.get_single_value("Education Settings", "create_so")
 	total_records = sum([int(d.total_students) for d in doc.student_groups])
-	created_records = 0
 
 	if not total_records:
 		frappe.throw(_("Please setup Students under Student Groups"))
 
+	provision_student_customers(fee_schedule)
+
+	students = []
 	for d in doc.student_groups:
-		students = get_students(
-			d.student_group, doc.academic_year, doc.academic_term, doc.student_category
+		students.extend(
+			student.student
+			for student in get_students(
+				d.student_group, doc.academic_year, doc.academic_term, doc.student_category
+			)
 		)
-		for student in students:
-			try:
-				student_id = student.student
-				if create_so:
-					create_sales_order(fee_schedule, student_id)
-				else:
-					create_sales_invoice(fee_schedule, student_id)
-				created_records += 1
-				frappe.publish_realtime(
-					"fee_schedule_progress",
-					{"progress": int(created_records * 100 / total_records)},
-					user=frappe.session.user,
-				)
 
-			except Exception as e:
-				error = True
-				err_msg = (
-					frappe.local.message_log and "\n\n".join(frappe.local.message_log) or cstr(e)
+	if resume:
+		existing = set(get_students_with_fee_records(fee_schedule))
+		students = [student for student in students if student not in existing]
+
+	chunks = make_fee_schedule_chunks(doc, students)
+	if not chunks:
+		update_fee_schedule_status(fee_schedule)
+		return
+
+	for chunk, chunk_students in chunks:
+		if run_in_background:
+			enqueue(
+				generate_fees_for_chunk,
+				queue="long",
+				timeout=6000,
+				event="generate_fees",
+				enqueue_after_commit=True,
+				fee_schedule=fee_schedule,
+				chunk=chunk,
+				students=chunk_students,
+			)
+		else:
+			generate_fees_for_chunk(fee_schedule, chunk, chunk_students)
+
+
+def generate_fees_for_chunk(fee_schedule, chunk, students):
+	"""Creates fee records for one chunk of students and commits them as a unit.
+
+	:param fee_schedule: Fee Schedule.
+	:param chunk: Fee Schedule Chunk row name.
+	:param students: List of Student IDs in the chunk.
+	"""
+	create_so = get_education_settings().create_so
+	template = make_fees_template(fee_schedule, "Sales Order" if create_so else "Sales Invoice")
+	customers = dict(
+		frappe.get_all(
+			"Student",
+			filters={"name": ("in", students or [""])},
+			fields=["name", "customer"],
+			as_list=True,
+		)
+	)
+	frappe.db.set_value("Fee Schedule Chunk", chunk, "status", "In Process")
+	frappe.db.savepoint("fee_schedule_chunk")
+	# only report messages raised while processing this chunk in its error log
+	frappe.clear_messages()
+
+	created_records = 0
+	last_published = time.monotonic()
+	try:
+		for student_id in students:
+			if create_so:
+				create_sales_order(
+					fee_schedule, student_id, template=template, customer=customers.get(student_id)
+				)
+			else:
+				create_sales_invoice(
+					fee_schedule, student_id, template=template, customer=customers.get(student_id)
 				)
+			created_records += 1
+
+			if time.monotonic() - last_published >= PROGRESS_PUBLISH_INTERVAL:
+				publish_fee_schedule_progress(fee_schedule, created_records)
+				last_published = time.monotonic()
+
+	except Exception as e:
+		frappe.db.rollback(save_point="fee_schedule_chunk")
+		err_msg = frappe.local.message_log and "\n\n".join(frappe.local.message_log) or cstr(e)
+		values = {
+			"status": "Failed",
+			"created_records": 0,
+			"error_log": _("Student {0}: {1}").format(student_id, err_msg),
+		}
+	else:
+		values = {"status": "Completed", "created_records": created_records, "error_log": None}
+
+	frappe.db.set_value("Fee Schedule Chunk", chunk, values)
+	update_fee_schedule_status(fee_schedule)
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
 
-	if error:
-		frappe.db.rollback()
-		frappe.db.set_value("Fee Schedule", fee_schedule, "status", "Failed")
-		frappe.db.set_value("Fee Schedule", fee_schedule, "error_log", err_msg)
 
+def make_fee_schedule_chunks(doc, students, chunk_size=FEE_GENERATION_CHUNK_SIZE):
+	"""Replaces the chunk rows of the Fee Schedule.
+
+	Returns:
+	        list: (chunk row name, list of students) for every chunk
+	"""
+	frappe.db.delete("Fee Schedule Chunk", {"parent": doc.name, "parenttype": doc.doctype})
+	doc.set("chunks", [])
+
+	chunks = []
+	for i in range(0, len(students), chunk_size):
+		chunk_students = students[i : i + chunk_size]
+		row = doc.append(
+			"chunks", {"status": "Queued", "total_students": len(chunk_students)}
+		)
+		row.db_insert()
+		chunks.append((row.name, chunk_students))
+	return chunks
+
+
+def update_fee_schedule_status(fee_schedule):
+	"""Sets the Fee Schedule status and error log once all of its chunks are finished."""
+	# lock the schedule so that chunk jobs finishing together agree on the final status,
+	# and read the chunks with a locking read so that rows committed by the other jobs
+	# are seen instead of this transaction's snapshot
+	frappe.db.get_value("Fee Schedule", fee_schedule, "name", for_update=True)
+	chunks = frappe.db.sql(
+		"""select idx, status, error_log from `tabFee Schedule Chunk`
+		where parent=%s and parenttype='Fee Schedule'
+		order by idx
+		for update""",
+		fee_schedule,
+		as_dict=True,
+	)
+	if any(d.status in ("Queued", "In Process") for d in chunks):
+		return
+
+	failed = [d for d in chunks if d.status == "Failed"]
+	if failed:
+		status = "Failed"
+		error_log = "\n\n".join(
+			_("Chunk {0}: {1}").format(d.idx, d.error_log) for d in failed
+		)
 	else:
-		if create_so:
-			frappe.db.set_value("Fee Schedule", fee_schedule, "status", "Order Created")
-		else:
-			frappe.db.set_value("Fee Schedule", fee_schedule, "status", "Invoice Created")
-		frappe.db.set_value("Fee Schedule", fee_schedule, "error_log", None)
+		status = "Order Created" if get_education_settings().create_so else "Invoice Created"
+		error_log = None
 
+	frappe.db.set_value(
+		"Fee Schedule", fee_schedule, {"status": status, "error_log": error_log}
+	)
 	frappe.publish_realtime(
 		"fee_schedule_progress",
 		{"progress": 100, "reload": 1},
@@ -168,47 +312,71 @@ def generate_fees(fee_schedule):
 	)
 
 
-def create_sales_invoice(fee_schedule, student_id, create_sales_order=False):
-	customer = get_customer_from_student(student_id)
+def publish_fee_schedule_progress(fee_schedule, in_process_records=0):
+	created_records, total_records = frappe.db.sql(
+		"""select sum(created_records), sum(total_students) from `tabFee Schedule Chunk`
+		where parent=%s and parenttype='Fee Schedule'""",
+		fee_schedule,
+	)[0]
+	if total_records:
+		frappe.publish_realtime(
+			"fee_schedule_progress",
+			{
+				"progress": int(
+					(flt(created_records) + in_process_records) * 100 / flt(total_records)
+				)
+			},
+			user=frappe.session.user,
+		)
+
+
+def get_students_with_fee_records(fee_schedule):
+	doctype = "Sales Order" if get_education_settings().create_so else "Sales Invoice"
+	return frappe.get_all(
+		doctype,
+		filters={"fee_schedule": fee_schedule, "docstatus": ("!=", 2)},
+		pluck="student",
+	)
+
+
+def create_sales_invoice(
+	fee_schedule, student_id, create_sales_order=False, template=None, customer=None
+):
+	customer = customer or get_customer_from_student(student_id)
 
 	sales_invoice_doc = get_fees_mapped_doc(
 		fee_schedule=fee_schedule,
 		doctype="Sales Invoice",
 		student_id=student_id,
 		customer=customer,
+		template=template,
 	)
 
-	if frappe.db.get_single_value(
-		"Education Settings", "sales_invoice_posting_date_fee_schedule"
-	):
+	settings = get_education_settings()
+	if settings.sales_invoice_posting_date_fee_schedule:
 		sales_invoice_doc.set_posting_time = 1
 
-	for item in sales_invoice_doc.items:
-		item.qty = 1
-
 	sales_invoice_doc.save()
-	if frappe.db.get_single_value("Education Settings", "auto_submit_sales_invoice"):
+	if settings.auto_submit_sales_invoice:
 		sales_invoice_doc.submit()
 
 	return sales_invoice_doc.name
 
 
-def create_sales_order(fee_schedule, student_id):
-	customer = get_customer_from_student(student_id)
+def create_sales_order(fee_schedule, student_id, template=None, customer=None):
+	customer = customer or get_customer_from_student(student_id)
 
 	sales_order_doc = get_fees_mapped_doc(
 		fee_schedule=fee_schedule,
 		doctype="Sales Order",
 		student_id=student_id,
 		customer=customer,
+		template=template,
 	)
 
-	for item in sales_order_doc.items:
-		item.qty = 1
-
 	sales_order_doc.save()
 
-	if frappe.db.get_single_value("Education Settings", "auto_submit_sales_order"):
+	if get_education_settings().auto_submit_sales_order:
 		sales_order_doc.submit()
 
 	return sales_order_doc.name
@@ -221,7 +389,213 @@ def get_customer_from_student(student_id):
 	return frappe.db.get_value("Student", student.name, "customer")
 
 
-def get_fees_mapped_doc(fee_schedule, doctype, student_id, customer):
+@frappe.whitelist()
+def provision_student_customers(fee_schedule=None):
+	"""Creates Customers for students without one and links them back in bulk.
+
+	:param fee_schedule: Fee Schedule whose students are provisioned. All students
+	        without a customer are provisioned if not set.
+	:returns: Number of customers created.
+	"""
+	students = get_students_without_customer(fee_schedule)
+	if students:
+		frappe.has_permission("Customer", "create", throw=True)
+		frappe.has_permission("Student", "write", throw=True)
+
+	for i in range(0, len(students), CUSTOMER_BATCH_SIZE):
+		batch = students[i : i + CUSTOMER_BATCH_SIZE]
+		customers = insert_student_customers(batch)
+		frappe.db.bulk_update(
+			"Student",
+			{
+				student.name: {
+					"customer": customers[student.name],
+					"customer_group": student.customer_group or "Student",
+				}
+				for student in batch
+			},
+			update_modified=False,
+		)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	return len(students)
+
+
+def insert_student_customers(students):
+	"""Creates one Customer per student with a multi-row insert per customer group.
+
+	A Customer is validated once per customer group and used as a template for the
+	others, which differ only by name and image. When customers are named by customer
+	name, students whose name is already taken, by an existing customer or by another
+	student of the batch, are inserted one by one after the multi-row inserts so that
+	ERPNext picks a free name for them.
+
+	Returns:
+	        dict: Customer name keyed by student
+	"""
+	by_series = (
+		frappe.db.get_single_value("Selling Settings", "cust_master_name") == "Naming Series"
+	)
+	taken = set()
+	if not by_series:
+		taken = {
+			cstr(name).lower()
+			for name in frappe.get_all(
+				"Customer",
+				filters={"name": ("in", [student.student_name for student in students])},
+				pluck="name",
+			)
+		}
+
+	customers, groups, renamed = {}, {}, []
+	for student in students:
+		if by_series or student.student_name.lower() not in taken:
+			taken.add(student.student_name.lower())
+			groups.setdefault(student.customer_group or "Student", []).append(student)
+		else:
+			renamed.append(student)
+
+	timestamp, user = now(), frappe.session.user
+	for customer_group, group_students in groups.items():
+		template = frappe.get_doc(make_customer_dict(group_students[0], customer_group))
+		template.run_method("validate")
+		template._validate_links()
+
+		values = template.get_valid_dict(convert_dates_to_str=True)
+		fields = list(values)
+		if by_series:
+			names = make_series_names(template.naming_series, len(group_students))
+		else:
+			names = [student.student_name for student in group_students]
+
+		rows = []
+		for name, student in zip(names, group_students):
+			values.update(
+				name=name,
+				customer_name=student.student_name,
+				image=student.image,
+				creation=timestamp,
+				modified=timestamp,
+				owner=user,
+				modified_by=user,
+			)
+			rows.append([values[f] for f in fields])
+			customers[student.name] = name
+
+		frappe.db.bulk_insert("Customer", fields=fields, values=rows)
+
+	for student in renamed:
+		customers[student.name] = (
+			frappe.get_doc(make_customer_dict(student, student.customer_group or "Student"))
+			.insert()
+			.name
+		)
+
+	return customers
+
+
+def make_customer_dict(student, customer_group):
+	return {
+		"doctype": "Customer",
+		"customer_name": student.student_name,
+		"customer_group": customer_group,
+		"customer_type": "Individual",
+		"image": student.image,
+	}
+
+
+def get_students_without_customer(fee_schedule=None):
+	"""Returns students without a linked Customer, limited to the Fee Schedule if given."""
+	if not fee_schedule:
+		return frappe.get_all(
+			"Student",
+			filters={"customer": ("is", "not set")},
+			fields=["name", "student_name", "customer_group", "image"],
+		)
+
+	doc = frappe.db.get_value(
+		"Fee Schedule",
+		fee_schedule,
+		["academic_year", "academic_term", "student_category"],
+		as_dict=True,
+	)
+	conditions = ""
+	if doc.student_category:
+		conditions = " and pe.student_category={}".format(frappe.db.escape(doc.student_category))
+	if doc.academic_term:
+		conditions += " and pe.academic_term={}".format(frappe.db.escape(doc.academic_term))
+
+	return frappe.db.sql(
+		"""
+        select distinct s.name, s.student_name, s.customer_group, s.image
+        from `tabFee Schedule Student Group` fsg, `tabStudent Group Student` sgs,
+            `tabProgram Enrollment` pe, `tabStudent` s
+        where
+            fsg.parent = %s and fsg.parenttype = 'Fee Schedule'
+            and sgs.parent = fsg.student_group and sgs.active = 1
+            and pe.docstatus = 1 and pe.student = sgs.student and pe.academic_year = %s
+            and s.name = sgs.student and ifnull(s.customer, '') = ''
+            {conditions}
+        """.format(
+			conditions=conditions
+		),
+		(fee_schedule, doc.academic_year),
+		as_dict=1,
+	)
+
+
+def get_fees_mapped_doc(fee_schedule, doctype, student_id, customer, template=None):
+	"""Returns an unsaved Sales Invoice or Sales Order of the Fee Schedule for a student.
+
+	:param template: Document returned by `make_fees_template`, cloned instead of mapping
+	        the Fee Schedule again.
+	"""
+	if template:
+		doc = frappe.copy_doc(template, ignore_no_copy=True)
+	else:
+		doc = make_fees_template(fee_schedule, doctype)
+	doc.student = student_id
+	doc.customer = customer
+	return doc
+
+
+def make_fees_template(fee_schedule, doctype):
+	"""Maps the Fee Schedule to an unsaved Sales Invoice or Sales Order without a student.
+
+	Item details are resolved here, so documents cloned from the template only differ by
+	student and customer.
+	"""
+	doc = get_mapped_doc(
+		"Fee Schedule",
+		fee_schedule,
+		get_fees_table_map(doctype),
+		ignore_permissions=True,
+	)
+
+	item_details = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			filters={"name": ("in", [item.item_code for item in doc.items] or [""])},
+			fields=["name", "item_name", "description", "stock_uom"],
+		)
+	}
+	for item in doc.items:
+		details = item_details.get(item.item_code) or frappe._dict()
+		item.qty = 1
+		item.item_name = item.item_name or details.item_name
+		item.description = item.description or details.description
+		item.stock_uom = item.stock_uom or details.stock_uom
+		item.uom = item.uom or details.stock_uom
+		item.conversion_factor = item.conversion_factor or 1
+
+	return doc
+
+
+def get_fees_table_map(doctype):
+	"""Returns the `get_mapped_doc` table map from Fee Schedule to a Sales Invoice or
+	Sales Order."""
 	table_map = {
 		"Fee Schedule": {
 			"doctype": doctype,
@@ -247,20 +621,10 @@ def get_fees_mapped_doc(fee_schedule, doctype, student_id, customer):
 		table_map["Fee Schedule"]["field_map"]["posting_date"] = "posting_date"
 	else:
 		table_map["Fee Schedule"]["field_map"]["due_date"] = "delivery_date"
-		if frappe.db.get_single_value(
-			"Education Settings", "sales_order_transaction_date_fee_schedule"
-		):
+		if get_education_settings().sales_order_transaction_date_fee_schedule:
 			table_map["Fee Schedule"]["field_map"]["posting_date"] = "transaction_date"
 
-	doc = get_mapped_doc(
-		"Fee Schedule",
-		fee_schedule,
-		table_map,
-		ignore_permissions=True,
-	)
-	doc.student = student_id
-	doc.customer = customer
-	return doc
+	return table_map
 
 
 #  gives program name for multiple enrollments in a calendar year
@@ -289,14 +653,51 @@ def get_students(
 	return students
 
 
+def get_student_counts(
+	student_groups, academic_year, academic_term=None, student_category=None
+):
+	"""Returns the number of students as counted by `get_students` and the program for
+	each Student Group, in one query.
+
+	Returns:
+	        dict: {student_group: {"total_students": int, "program": str}}
+	"""
+	if not student_groups:
+		return {}
+
+	conditions = ""
+	if student_category:
+		conditions = " and pe.student_category={}".format(frappe.db.escape(student_category))
+	if academic_term:
+		conditions += " and pe.academic_term={}".format(frappe.db.escape(academic_term))
+	counts = frappe.db.sql(
+		"""
+        select sg.name as student_group, sg.program, count(pe.name) as total_students
+        from `tabStudent Group` sg
+        left join `tabStudent Group Student` sgs
+            on sgs.parent = sg.name and sgs.active = 1
+        left join `tabProgram Enrollment` pe
+            on pe.student = sgs.student and pe.docstatus = 1 and pe.academic_year = %(academic_year)s
+            {conditions}
+        where sg.name in %(student_groups)s
+        group by sg.name, sg.program
+        """.format(
+			conditions=conditions
+		),
+		{"academic_year": academic_year, "student_groups": tuple(student_groups)},
+		as_dict=1,
+	)
+	return {d.student_group: d for d in counts}
+
+
 @frappe.whitelist()
 def get_total_students(
 	student_group, academic_year, academic_term=None, student_category=None
 ):
-	total_students = get_students(
-		student_group, academic_year, academic_term, student_category
+	student_counts = get_student_counts(
+		[student_group], academic_year, academic_term, student_category
 	)
-	return len(total_students)
+	return cint((student_counts.get(student_group) or {}).get("total_students"))
 
 
 @frappe.whitelist()
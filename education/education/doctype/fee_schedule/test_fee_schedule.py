@@ -3,7 +3,15 @@
 
 import frappe
 from frappe.tests.utils import FrappeTestCase
-from education.education.doctype.fee_schedule.fee_schedule import generate_fees
+from education.education.doctype.fee_schedule.fee_schedule import (
+	generate_fees,
+	generate_fees_for_chunk,
+	get_student_counts,
+	make_fee_schedule_chunks,
+	provision_student_customers,
+)
+from education.education.settings import clear_education_settings_cache
+from education.education.utils import make_series_names
 
 from education.education.test_utils import (
 	create_academic_year,
@@ -43,6 +51,7 @@ class TestFeeSchedule(FrappeTestCase):
 
 	def tearDown(self):
 		frappe.db.rollback()
+		clear_education_settings_cache()
 
 	def test_fee_schedule(self):
 		fee_schedule = create_fee_schedule(submit=1)
@@ -75,6 +84,7 @@ class TestFeeSchedule(FrappeTestCase):
 	def test_sales_order_creation_flow(self):
 		# create_so from education settings set to 1
 		frappe.db.set_value("Education Settings", "Education Settings", "create_so", 1)
+		clear_education_settings_cache()
 		due_date = frappe.utils.add_days(frappe.utils.nowdate(), 2)
 		fee_schedule = create_fee_schedule(submit=1, due_date=due_date)
 
@@ -91,3 +101,132 @@ class TestFeeSchedule(FrappeTestCase):
 		self.assertEqual(len(sales_invoices), 0)
 		fee_schedule_status = frappe.db.get_value("Fee Schedule", fee_schedule.name, "status")
 		self.assertEqual(fee_schedule_status, "Order Created")
+
+	def test_resume_fee_creation(self):
+		due_date = frappe.utils.add_days(frappe.utils.nowdate(), 2)
+		fee_schedule = create_fee_schedule(submit=1, due_date=due_date)
+		generate_fees(fee_schedule.name)
+		generate_fees(fee_schedule.name, resume=True)
+
+		sales_invoices = frappe.get_all(
+			"Sales Invoice", filters={"fee_schedule": fee_schedule.name}
+		)
+		self.assertEqual(len(sales_invoices), 1)
+		fee_schedule_status = frappe.db.get_value("Fee Schedule", fee_schedule.name, "status")
+		self.assertEqual(fee_schedule_status, "Invoice Created")
+
+	def test_fee_creation_chunks(self):
+		due_date = frappe.utils.add_days(frappe.utils.nowdate(), 2)
+		fee_schedule = create_fee_schedule(submit=1, due_date=due_date)
+		generate_fees(fee_schedule.name)
+
+		chunks = frappe.get_all(
+			"Fee Schedule Chunk",
+			filters={"parent": fee_schedule.name},
+			fields=["status", "total_students", "created_records"],
+		)
+		self.assertEqual(len(chunks), 1)
+		self.assertEqual(chunks[0].status, "Completed")
+		self.assertEqual(chunks[0].created_records, chunks[0].total_students)
+
+	def test_student_counts(self):
+		if not frappe.db.exists("Student Category", "_Test Category"):
+			frappe.get_doc({"doctype": "Student Category", "category": "_Test Category"}).insert()
+
+		counts = get_student_counts(["Test Student Group"], "2023-2024")
+		self.assertEqual(counts["Test Student Group"].total_students, 1)
+		self.assertEqual(counts["Test Student Group"].program, "Class 1")
+		counts = get_student_counts(["Test Student Group"], "2023-2024", "2023-2024 (Term 1)")
+		self.assertEqual(counts["Test Student Group"].total_students, 1)
+		counts = get_student_counts(
+			["Test Student Group"], "2023-2024", student_category="_Test Category"
+		)
+		self.assertEqual(counts["Test Student Group"].total_students, 0)
+
+		fee_schedule = create_fee_schedule()
+		self.assertEqual(fee_schedule.student_groups[0].total_students, 1)
+
+		# unrelated changes keep the stored counts
+		fee_schedule.student_groups[0].total_students = 5
+		fee_schedule.send_email = not fee_schedule.send_email
+		fee_schedule.save()
+		self.assertEqual(fee_schedule.student_groups[0].total_students, 5)
+		self.assertEqual(fee_schedule.grand_total, 5 * fee_schedule.total_amount)
+
+		# changing a filter of the students recomputes them
+		fee_schedule.student_category = "_Test Category"
+		fee_schedule.save()
+		self.assertEqual(fee_schedule.student_groups[0].total_students, 0)
+
+		fee_schedule.student_category = None
+		fee_schedule.save()
+		self.assertEqual(fee_schedule.student_groups[0].total_students, 1)
+
+	def test_fee_schedule_status_after_all_chunks(self):
+		student = create_student("_Test", "Chunk", student_email_id="_test_chunk@example.com")
+		create_program_enrollment(student_name=student.name, submit=1)
+		student_group = frappe.get_doc("Student Group", "Test Student Group")
+		student_group.append("students", {"student": student.name})
+		student_group.save()
+
+		due_date = frappe.utils.add_days(frappe.utils.nowdate(), 2)
+		fee_schedule = create_fee_schedule(submit=1, due_date=due_date)
+		students = [d.student for d in student_group.students]
+		chunks = make_fee_schedule_chunks(fee_schedule, students, chunk_size=1)
+		self.assertEqual(len(chunks), 2)
+
+		generate_fees_for_chunk(fee_schedule.name, *chunks[0])
+		self.assertEqual(
+			frappe.db.get_value("Fee Schedule", fee_schedule.name, "status"), "Invoice Pending"
+		)
+
+		generate_fees_for_chunk(fee_schedule.name, *chunks[1])
+		self.assertEqual(
+			frappe.db.get_value("Fee Schedule", fee_schedule.name, "status"), "Invoice Created"
+		)
+
+	def test_provision_student_customers(self):
+		student = create_student()
+		frappe.db.set_value("Student", student.name, "customer", None)
+
+		self.assertGreaterEqual(provision_student_customers(), 1)
+		customer = frappe.db.get_value("Student", student.name, "customer")
+		self.assertTrue(customer)
+		self.assertEqual(
+			frappe.db.get_value("Customer", customer, "customer_name"), student.student_name
+		)
+
+	def test_provision_customers_for_students_with_the_same_name(self):
+		frappe.db.set_value("Selling Settings", None, "cust_master_name", "Customer Name")
+		students = [
+			create_student("_Test", "Twin", student_email_id="_test_twin_1@example.com"),
+			create_student("_Test", "Twin", student_email_id="_test_twin_2@example.com"),
+		]
+		for student in students:
+			frappe.db.set_value("Student", student.name, "customer", None)
+		frappe.db.delete("Customer", {"customer_name": students[0].student_name})
+
+		self.assertGreaterEqual(provision_student_customers(), 2)
+		customers = [
+			frappe.db.get_value("Student", student.name, "customer") for student in students
+		]
+		self.assertTrue(all(customers))
+		self.assertEqual(len(set(customers)), 2)
+		self.assertIn(students[0].student_name, customers)
+		for customer in customers:
+			self.assertEqual(
+				frappe.db.get_value("Customer", customer, "customer_name"),
+				students[0].student_name,
+			)
+
+	def test_make_series_names(self):
+		self.assertEqual(
+			make_series_names("_TEST-SERIES-.####", 2), ["_TEST-SERIES-0001", "_TEST-SERIES-0002"]
+		)
+		self.assertEqual(
+			frappe.db.sql("select `current` from `tabSeries` where `name`='_TEST-SERIES-'")[0][0],
+			2,
+		)
+
+		# without a `#` run numbers are padded to five digits on the same counter
+		self.assertEqual(make_series_names("_TEST-SERIES-", 1), ["_TEST-SERIES-00003"])
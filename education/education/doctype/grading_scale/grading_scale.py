@@ -1,11 +1,12 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+from bisect import bisect_right
 
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import cint
+from frappe.utils import cint, flt
 
 
 class GradingScale(Document):
@@ -18,3 +19,41 @@ class GradingScale(Document):
 				thresholds.append(cint(d.threshold))
 		if 0 not in thresholds:
 			frappe.throw(_("Please define grade for Threshold 0%"))
+
+
+class CompiledGradingScale:
+	"""Grade lookup for a Grading Scale using its thresholds sorted for bisection."""
+
+	def __init__(self, name, intervals):
+		self.name = name
+		intervals = sorted(intervals, key=lambda d: flt(d.threshold))
+		self.thresholds = [flt(d.threshold) for d in intervals]
+		self.grades = [d.grade_code for d in intervals]
+
+	def get_grade(self, percentage):
+		"""Returns the grade of the highest threshold not above the percentage."""
+		index = bisect_right(self.thresholds, flt(percentage))
+		return self.grades[index - 1] if index else ""
+
+	def get_grades(self, percentages):
+		"""Returns grades for a list, tuple or array of percentages, in the same order."""
+		return [self.get_grade(percentage) for percentage in percentages]
+
+
+def get_compiled_grading_scale(grading_scale):
+	"""Returns the compiled Grading Scale, built once per request for each scale name."""
+	if not hasattr(frappe.local, "compiled_grading_scales"):
+		frappe.local.compiled_grading_scales = {}
+
+	if grading_scale not in frappe.local.compiled_grading_scales:
+		intervals = frappe.get_all(
+			"Grading Scale Interval",
+			fields=["grade_code", "threshold"],
+			filters={"parent": grading_scale},
+			order_by="idx",
+		)
+		frappe.local.compiled_grading_scales[grading_scale] = CompiledGradingScale(
+			grading_scale, intervals
+		)
+
+	return frappe.local.compiled_grading_scales[grading_scale]
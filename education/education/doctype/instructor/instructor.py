@@ -7,12 +7,12 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.model.naming import set_name_by_naming_series
 
+from education.education.settings import get_education_settings
+
 
 class Instructor(Document):
 	def autoname(self):
-		naming_method = frappe.db.get_value(
-			"Education Settings", None, "instructor_created_by"
-		)
+		naming_method = get_education_settings().instructor_created_by
 		if not naming_method:
 			frappe.throw(
 				_("Please setup Instructor Naming System in Education > Education Settings")
@@ -12,6 +12,9 @@ from education.education.doctype.fee_schedule.fee_schedule import (
 	create_sales_invoice,
 	create_sales_order,
 )
+from education.education.api import clear_portal_bootstrap_for_students
+from education.education.settings import get_education_settings
+from education.education.utils import clear_lms_context_for_students
 
 
 class ProgramEnrollment(Document):
@@ -30,9 +33,13 @@ class ProgramEnrollment(Document):
 		self.update_student_joining_date()
 		self.make_fee_records()
 		self.create_course_enrollments()
+		clear_portal_bootstrap_for_students([self.student])
+		clear_lms_context_for_students([self.student])
 
 	def on_cancel(self):
 		self.delete_course_enrollments()
+		clear_portal_bootstrap_for_students([self.student])
+		clear_lms_context_for_students([self.student])
 		pass
 
 	def validate_duplication(self):
@@ -64,7 +71,7 @@ class ProgramEnrollment(Document):
 	def make_fee_records(self):
 		from education.education.api import get_fee_components
 
-		create_so = frappe.db.get_single_value("Education Settings", "create_so")
+		create_so = get_education_settings().create_so
 
 		fees_list = []
 		doctype = ""
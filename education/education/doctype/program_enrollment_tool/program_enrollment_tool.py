@@ -8,13 +8,12 @@ from frappe.model.document import Document
 from frappe.utils import cint
 
 from education.education.api import enroll_student
+from education.education.settings import get_education_settings
 
 
 class ProgramEnrollmentTool(Document):
 	def onload(self):
-		academic_term_reqd = cint(
-			frappe.db.get_single_value("Education Settings", "academic_term_reqd")
-		)
+		academic_term_reqd = cint(get_education_settings().academic_term_reqd)
 		self.set_onload("academic_term_reqd", academic_term_reqd)
 
 	@frappe.whitelist()
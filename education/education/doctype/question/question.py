@@ -13,6 +13,14 @@ class Question(Document):
 		self.check_minimum_one_correct_answer()
 		self.set_question_type()
 
+	def on_update(self):
+		from education.education.doctype.quiz.quiz import clear_quiz_cache
+
+		for quiz in frappe.get_all(
+			"Quiz Question", filters={"question_link": self.name}, pluck="parent"
+		):
+			clear_quiz_cache(quiz)
+
 	def check_at_least_one_option(self):
 		if len(self.options) <= 1:
 			frappe.throw(_("A question must have more than one options"))
@@ -12,6 +12,12 @@ class Quiz(Document):
 		if self.passing_score > 100:
 			frappe.throw(_("Passing Score value should be between 0 and 100"))
 
+	def on_update(self):
+		clear_quiz_cache(self.name)
+
+	def on_trash(self):
+		clear_quiz_cache(self.name)
+
 	def allowed_attempt(self, enrollment, quiz_name):
 		if self.max_attempts == 0:
 			return True
@@ -31,21 +37,16 @@ class Quiz(Document):
 			return False
 
 	def evaluate(self, response_dict, quiz_name):
-		questions = [
-			frappe.get_doc("Question", question.question_link) for question in self.question
-		]
-		answers = {q.name: q.get_answer() for q in questions}
+		answer_key = get_answer_key(quiz_name, self.modified)
 		result = {}
-		for key in answers:
-			try:
-				if isinstance(response_dict[key], list):
-					is_correct = compare_list_elementwise(response_dict[key], answers[key])
-				else:
-					is_correct = response_dict[key] == answers[key]
-			except Exception as e:
-				is_correct = False
+		for key, answers in answer_key["answers"].items():
+			response = response_dict.get(key)
+			if isinstance(response, list):
+				is_correct = len(response) == len(answers) and set(response) <= set(answers)
+			else:
+				is_correct = len(answers) == 1 and response == answers[0]
 			result[key] = is_correct
-		score = (sum(result.values()) * 100) / len(answers)
+		score = (sum(result.values()) * 100) / len(result)
 		if score >= self.passing_score:
 			status = "Pass"
 		else:
@@ -58,6 +59,105 @@ class Quiz(Document):
 		]
 
 
+def get_answer_key(quiz, modified=None):
+	"""Returns the compiled answer key of a Quiz, cached in Redis.
+
+	The key holds, for every question of the quiz, the names of its correct options and
+	the labels of all of its options. A cached key is only used if it was built from
+	the quiz's current `modified`. Saving one of the questions drops the key instead,
+	see `Question.on_update`.
+
+	:param quiz: Quiz name.
+	:param modified: `modified` of the Quiz if already known, to validate the cached key.
+	"""
+	answer_key = frappe.cache().hget("quiz_answer_key", quiz)
+	if answer_key and (not modified or answer_key.get("modified") == str(modified)):
+		return answer_key
+
+	answer_key = make_answer_key(quiz)
+	frappe.cache().hset("quiz_answer_key", quiz, answer_key)
+	return answer_key
+
+
+def make_answer_key(quiz):
+	quiz_modified = frappe.db.get_value("Quiz", quiz, "modified")
+	questions = frappe.get_all(
+		"Quiz Question", filters={"parent": quiz}, pluck="question_link", order_by="idx"
+	)
+	questions = list(dict.fromkeys(questions))
+
+	answers = {question: [] for question in questions}
+	labels = {}
+	for option in frappe.get_all(
+		"Options",
+		filters={"parent": ("in", questions or [""]), "parenttype": "Question"},
+		fields=["name", "parent", "option", "is_correct"],
+		order_by="idx",
+	):
+		labels[option.name] = option.option
+		if option.is_correct:
+			answers[option.parent].append(option.name)
+
+	for question, correct_options in answers.items():
+		if not correct_options:
+			frappe.throw(_("No correct answer is set for {0}").format(question))
+
+	return {
+		"modified": str(quiz_modified),
+		"questions": questions,
+		"answers": answers,
+		"labels": labels,
+	}
+
+
+def get_quiz_payload(quiz, modified):
+	"""Returns the serialized questions and options of a Quiz, cached in Redis by quiz
+	name and `modified`.
+
+	:param quiz: Quiz name.
+	:param modified: `modified` of the Quiz.
+	"""
+	payload = frappe.cache().hget("quiz_payload", quiz)
+	if payload and payload["modified"] == str(modified):
+		return payload["questions"]
+
+	questions = frappe.db.sql(
+		"""select q.name, q.question, q.question_type as type
+		from `tabQuiz Question` qq inner join `tabQuestion` q on q.name = qq.question_link
+		where qq.parent = %s and qq.parenttype = 'Quiz'
+		order by qq.idx""",
+		quiz,
+		as_dict=True,
+	)
+	options = {}
+	for option in frappe.get_all(
+		"Options",
+		filters={"parent": ("in", [q.name for q in questions] or [""]), "parenttype": "Question"},
+		fields=["name", "parent", "option"],
+		order_by="idx",
+	):
+		options.setdefault(option.parent, []).append(
+			{"name": option.name, "option": option.option}
+		)
+
+	questions = [
+		{
+			"name": q.name,
+			"question": q.question,
+			"type": q.type,
+			"options": options.get(q.name, []),
+		}
+		for q in questions
+	]
+	frappe.cache().hset("quiz_payload", quiz, {"modified": str(modified), "questions": questions})
+	return questions
+
+
+def clear_quiz_cache(quiz):
+	frappe.cache().hdel("quiz_answer_key", quiz)
+	frappe.cache().hdel("quiz_payload", quiz)
+
+
 def compare_list_elementwise(*args):
 	try:
 		if all(len(args[0]) == len(_arg) for _arg in args[1:]):
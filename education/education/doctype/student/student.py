@@ -3,13 +3,14 @@
 
 
 import frappe
+from erpnext import get_default_currency
 from frappe import _
 from frappe.desk.form.linked_with import get_linked_doctypes
 from frappe.model.document import Document
 from frappe.utils import getdate, today
-from erpnext import get_default_currency
 from frappe.utils.nestedset import get_root_of
 
+from education.education.settings import get_education_settings
 from education.education.utils import check_content_completion, check_quiz_completion
 
 
@@ -27,6 +28,13 @@ class Student(Document):
 		# for each student check whether a customer exists or not if it does not exist then create a customer with customer group student
 		# This prevents from polluting users data
 		self.set_missing_customer_details()
+		self.clear_portal_bootstrap()
+
+	def clear_portal_bootstrap(self):
+		from education.education.api import clear_portal_bootstrap
+
+		doc_before_save = self.get_doc_before_save()
+		clear_portal_bootstrap([self.user, doc_before_save and doc_before_save.user])
 
 	def set_missing_customer_details(self):
 		self.set_customer_group()
@@ -70,9 +78,9 @@ class Student(Document):
 
 	def validate_user(self):
 		"""Create a website user for student creation if not already exists"""
-		if not frappe.db.get_single_value(
-			"Education Settings", "user_creation_skip"
-		) and not frappe.db.exists("User", self.student_email_id):
+		if not get_education_settings().user_creation_skip and not frappe.db.exists(
+			"User", self.student_email_id
+		):
 			student_user = frappe.get_doc(
 				{
 					"doctype": "User",
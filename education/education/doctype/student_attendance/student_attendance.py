@@ -7,9 +7,10 @@ from erpnext import get_default_company
 from erpnext.setup.doctype.holiday_list.holiday_list import is_holiday
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import formatdate, get_link_to_form, getdate
+from frappe.utils import formatdate, get_link_to_form, getdate, now
 
 from education.education.api import get_student_group_students
+from education.education.utils import make_series_names
 
 
 class StudentAttendance(Document):
@@ -45,19 +46,7 @@ class StudentAttendance(Document):
 			academic_year = frappe.db.get_value(
 				"Student Group", self.student_group, "academic_year"
 			)
-			if academic_year:
-				year_start_date, year_end_date = frappe.db.get_value(
-					"Academic Year", academic_year, ["year_start_date", "year_end_date"]
-				)
-				if year_start_date and year_end_date:
-					if getdate(self.date) < getdate(year_start_date) or getdate(self.date) > getdate(
-						year_end_date
-					):
-						frappe.throw(
-							_("Attendance cannot be marked outside of Academic Year {0}").format(
-								academic_year
-							)
-						)
+			validate_academic_year(academic_year, self.date)
 
 	def set_student_group(self):
 		if self.course_schedule:
@@ -127,6 +116,12 @@ class StudentAttendance(Document):
 			)
 
 
+def on_doctype_update():
+	frappe.db.add_index(
+		"Student Attendance", ["student", "student_group", "docstatus", "date"]
+	)
+
+
 def get_holiday_list(company=None):
 	if not company:
 		company = get_default_company() or frappe.get_all("Company")[0].name
@@ -139,3 +134,190 @@ def get_holiday_list(company=None):
 			)
 		)
 	return holiday_list
+
+
+def mark_bulk_attendance(students, course_schedule=None, student_group=None, date=None):
+	"""Creates or updates Student Attendance records for a list of students in one go.
+
+	The roster, holiday list, academic year bounds and existing attendance are fetched
+	once per call and rows are validated against them with the same rules as
+	`StudentAttendance.validate`. New records are written with a multi-row insert and
+	draft records with a single bulk update, both directly in the submitted state.
+
+	Documents are not loaded, so `on_submit` and any `doc_events` hooks registered for
+	Student Attendance are not run for these records.
+
+	:param students: List of dicts with `student`, `student_name` and `status`.
+	:param course_schedule: Course Schedule.
+	:param student_group: Student Group.
+	:param date: Date.
+	:returns: dict with `created`, `updated` and `rejected` rows.
+	"""
+	frappe.has_permission("Student Attendance", "create", throw=True)
+	frappe.has_permission("Student Attendance", "submit", throw=True)
+
+	if not (student_group or course_schedule):
+		frappe.throw(
+			_("{0} or {1} is mandatory").format(
+				frappe.bold("Student Group"), frappe.bold("Course Schedule")
+			),
+			title=_("Mandatory Fields"),
+		)
+
+	if course_schedule:
+		date, student_group = frappe.db.get_value(
+			"Course Schedule", course_schedule, ["schedule_date", "student_group"]
+		)
+
+	group = frappe.db.get_value(
+		"Student Group", student_group, ["academic_year", "program"], as_dict=True
+	) or frappe._dict()
+	validate_academic_year(group.academic_year, date)
+
+	if is_holiday(get_holiday_list(), date):
+		frappe.throw(
+			_("Attendance cannot be marked for {0} as it is a holiday.").format(
+				frappe.bold(formatdate(date))
+			)
+		)
+
+	roster = {d.student for d in get_student_group_students(student_group)}
+	existing = get_existing_attendance(
+		[d.get("student") for d in students], course_schedule, student_group, date
+	)
+	mobile_numbers = dict(
+		frappe.get_all(
+			"Student",
+			filters={"name": ("in", list(roster) or [""])},
+			fields=["name", "student_mobile_number"],
+			as_list=True,
+		)
+	)
+
+	summary = {"created": [], "updated": [], "rejected": []}
+	to_insert, to_update, seen = [], {}, set()
+	for d in students:
+		student = d.get("student")
+		if student in seen:
+			summary["rejected"].append(
+				{"student": student, "reason": _("Student appears multiple times")}
+			)
+			continue
+		seen.add(student)
+
+		if student_group and student not in roster:
+			summary["rejected"].append(
+				{
+					"student": student,
+					"reason": _("Student {0}: {1} does not belong to Student Group {2}").format(
+						student, d.get("student_name"), student_group
+					),
+				}
+			)
+			continue
+
+		record = existing.get(student)
+		if record and record.docstatus == 1:
+			summary["rejected"].append(
+				{
+					"student": student,
+					"reason": _("Student Attendance record {0} already exists against the Student {1}").format(
+						record.name, student
+					),
+				}
+			)
+		elif record:
+			to_update[record.name] = {"status": d.get("status"), "docstatus": 1}
+			summary["updated"].append({"student": student, "name": record.name})
+		else:
+			to_insert.append(d)
+
+	if to_insert:
+		naming_series = get_attendance_naming_series()
+		names = make_series_names(naming_series, len(to_insert))
+		timestamp, user = now(), frappe.session.user
+		values = []
+		for name, d in zip(names, to_insert):
+			values.append(
+				(
+					name,
+					timestamp,
+					timestamp,
+					user,
+					user,
+					1,
+					naming_series,
+					d.get("student"),
+					d.get("student_name"),
+					mobile_numbers.get(d.get("student")),
+					course_schedule,
+					student_group,
+					group.program,
+					date,
+					d.get("status"),
+				)
+			)
+			summary["created"].append({"student": d.get("student"), "name": name})
+
+		frappe.db.bulk_insert(
+			"Student Attendance",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"docstatus",
+				"naming_series",
+				"student",
+				"student_name",
+				"student_mobile_number",
+				"course_schedule",
+				"student_group",
+				"link_nvfk",
+				"date",
+				"status",
+			],
+			values=values,
+		)
+
+	if to_update:
+		frappe.db.bulk_update("Student Attendance", to_update)
+
+	return summary
+
+
+def validate_academic_year(academic_year, date):
+	if not academic_year:
+		return
+
+	year_start_date, year_end_date = frappe.db.get_value(
+		"Academic Year", academic_year, ["year_start_date", "year_end_date"]
+	)
+	if year_start_date and year_end_date:
+		if getdate(date) < getdate(year_start_date) or getdate(date) > getdate(year_end_date):
+			frappe.throw(
+				_("Attendance cannot be marked outside of Academic Year {0}").format(academic_year)
+			)
+
+
+def get_existing_attendance(students, course_schedule=None, student_group=None, date=None):
+	"""Returns non cancelled Student Attendance records keyed by student."""
+	filters = {"student": ("in", students or [""]), "docstatus": ("!=", 2)}
+	if course_schedule:
+		filters["course_schedule"] = course_schedule
+	else:
+		filters.update({"student_group": student_group, "date": date})
+
+	records = frappe.get_all(
+		"Student Attendance", filters=filters, fields=["name", "student", "docstatus"]
+	)
+	return {d.student: d for d in records}
+
+
+def get_attendance_naming_series():
+	"""Returns the naming series new Student Attendance records get by default, as
+	configured in the `naming_series` field (including Property Setters)."""
+	field = frappe.get_meta("Student Attendance").get_field("naming_series")
+	options = [d for d in (field.options or "").split("\n") if d]
+	return field.default or options[0]
@@ -2,10 +2,132 @@
 # See license.txt
 
 
+import frappe
+from erpnext import get_default_company
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from education.education.doctype.student_attendance.student_attendance import (
+	mark_bulk_attendance,
+)
+from education.education.test_utils import (
+	create_academic_term,
+	create_academic_year,
+	create_program,
+	create_program_enrollment,
+	create_student,
+	create_student_group,
+)
 
 # test_records = frappe.get_test_records('Student Attendance')
 
 
 class TestStudentAttendance(FrappeTestCase):
-	pass
+	def setUp(self):
+		set_attendance_holiday_list()
+		create_academic_year()
+		create_academic_term(
+			term_name="Term 1", term_start_date="2023-04-01", term_end_date="2023-09-30"
+		)
+		create_program()
+		student = create_student()
+		create_program_enrollment(student_name=student.name, submit=1)
+		create_student_group()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_mark_bulk_attendance(self):
+		date = "2023-08-08"
+		student_group = frappe.get_doc("Student Group", "Test Student Group")
+		student = student_group.students[0].student
+		other_student = add_student_to_group(student_group, "_test_attendance@example.com")
+		outsider = create_student("_Test", "Outsider", student_email_id="_test_outsider@example.com")
+		outsider = outsider.name
+		draft = frappe.get_doc(
+			{
+				"doctype": "Student Attendance",
+				"student": other_student,
+				"student_group": student_group.name,
+				"date": date,
+				"status": "Present",
+			}
+		).insert()
+
+		summary = mark_bulk_attendance(
+			[
+				{"student": student, "status": "Present"},
+				{"student": other_student, "status": "Absent"},
+				{"student": outsider, "status": "Present"},
+				{"student": student, "status": "Absent"},
+			],
+			student_group=student_group.name,
+			date=date,
+		)
+
+		self.assertEqual([d["student"] for d in summary["created"]], [student])
+		self.assertEqual(summary["updated"], [{"student": other_student, "name": draft.name}])
+		self.assertEqual(
+			sorted(d["student"] for d in summary["rejected"]), sorted([outsider, student])
+		)
+
+		created = frappe.db.get_value(
+			"Student Attendance",
+			summary["created"][0]["name"],
+			["student", "student_group", "date", "status", "docstatus"],
+			as_dict=True,
+		)
+		self.assertEqual(created.student, student)
+		self.assertEqual(created.student_group, student_group.name)
+		self.assertEqual(getdate(created.date), getdate(date))
+		self.assertEqual(created.status, "Present")
+		self.assertEqual(created.docstatus, 1)
+		self.assertEqual(
+			frappe.db.get_value("Student Attendance", draft.name, ["status", "docstatus"]),
+			("Absent", 1),
+		)
+
+		# submitted records are left as they are
+		summary = mark_bulk_attendance(
+			[{"student": student, "status": "Absent"}],
+			student_group=student_group.name,
+			date=date,
+		)
+		self.assertFalse(summary["created"] or summary["updated"])
+		self.assertEqual([d["student"] for d in summary["rejected"]], [student])
+		self.assertEqual(
+			frappe.db.count("Student Attendance", {"student": student, "date": date}), 1
+		)
+
+	def test_mark_bulk_attendance_on_holiday(self):
+		student_group = frappe.get_doc("Student Group", "Test Student Group")
+		self.assertRaises(
+			frappe.ValidationError,
+			mark_bulk_attendance,
+			[{"student": student_group.students[0].student, "status": "Present"}],
+			student_group=student_group.name,
+			date="2023-08-09",
+		)
+
+
+def set_attendance_holiday_list():
+	holiday_list = frappe.get_doc(
+		{
+			"doctype": "Holiday List",
+			"holiday_list_name": "_Test Student Attendance Holidays",
+			"from_date": "2023-08-01",
+			"to_date": "2023-08-31",
+			"holidays": [{"holiday_date": "2023-08-09", "description": "Test Holiday"}],
+		}
+	).insert()
+	frappe.db.set_value(
+		"Company", get_default_company(), "default_holiday_list", holiday_list.name
+	)
+
+
+def add_student_to_group(student_group, student_email_id):
+	student = create_student("_Test", "Attendance", student_email_id=student_email_id)
+	create_program_enrollment(student_name=student.name, submit=1)
+	student_group.append("students", {"student": student.name})
+	student_group.save()
+	return student.name
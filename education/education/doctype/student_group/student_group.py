@@ -4,5 +4,44 @@
 from frappe.model.document import Document
 import frappe
 
+from education.education.doctype.student_timetable_entry.student_timetable_entry import (
+    update_timetable_for_group,
+)
+
+
 class StudentGroup(Document):
-    pass
+    def on_update(self):
+        self.update_student_timetable()
+        self.clear_portal_bootstrap()
+
+    def update_student_timetable(self):
+        """Rebuilds timetable entries of students added, removed or (de)activated, or
+        of the whole group when its course or enabled state changes"""
+        doc_before_save = self.get_doc_before_save()
+        if doc_before_save and any(
+            self.get(f) != doc_before_save.get(f) for f in ("course", "disabled")
+        ):
+            update_timetable_for_group(self.name)
+            return
+
+        before = get_active_students(doc_before_save) if doc_before_save else set()
+        after = get_active_students(self)
+        if before != after:
+            update_timetable_for_group(self.name, before ^ after)
+
+    def clear_portal_bootstrap(self):
+        """Drops cached portal payloads of students whose groups may have changed"""
+        from education.education.api import clear_portal_bootstrap_for_students
+
+        doc_before_save = self.get_doc_before_save()
+        students = {d.get("student") for d in self.get("students") or []}
+        if doc_before_save:
+            students |= {d.get("student") for d in doc_before_save.get("students") or []}
+        clear_portal_bootstrap_for_students(students)
+
+    def on_trash(self):
+        frappe.db.delete("Student Timetable Entry", {"student_group": self.name})
+
+
+def get_active_students(doc):
+    return {d.get("student") for d in doc.get("students") or [] if d.get("active")}
@@ -0,0 +1,182 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+TIMETABLE_FIELDS = (
+	"title",
+	"course",
+	"program",
+	"schedule_date",
+	"from_time",
+	"to_time",
+	"room",
+	"instructor",
+	"class_schedule_color",
+)
+
+
+class StudentTimetableEntry(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Student Timetable Entry", ["student", "schedule_date", "from_time"])
+
+
+def get_schedule_fields():
+	"""Returns the timetable fields present on Course Schedule"""
+	meta = frappe.get_meta("Course Schedule")
+	return [f for f in TIMETABLE_FIELDS if meta.has_field(f)]
+
+
+def get_schedules(filters, fields):
+	"""Returns Course Schedules with the given timetable fields and what
+	`get_schedule_groups` needs to resolve their Student Groups"""
+	query_fields = ["name", "course", *fields]
+	if frappe.get_meta("Course Schedule").has_field("student_group"):
+		query_fields.append("student_group")
+	return frappe.get_all(
+		"Course Schedule", filters=filters, fields=list(dict.fromkeys(query_fields))
+	)
+
+
+def get_schedule_groups(schedules):
+	"""Returns the Student Groups attending each Course Schedule, keyed by schedule.
+
+	Where Course Schedule links a Student Group, that group attends. Otherwise a
+	schedule is attended by every enabled Student Group of its course.
+	"""
+	if frappe.get_meta("Course Schedule").has_field("student_group"):
+		return {s.name: [s.student_group] if s.student_group else [] for s in schedules}
+
+	groups = {}
+	courses = list({s.course for s in schedules if s.course})
+	if courses:
+		for d in frappe.get_all(
+			"Student Group",
+			filters={"course": ("in", courses), "disabled": 0},
+			fields=["name", "course"],
+		):
+			groups.setdefault(d.course, []).append(d.name)
+
+	return {s.name: groups.get(s.course, []) for s in schedules}
+
+
+def update_timetable_for_schedules(course_schedules):
+	"""Rebuilds timetable entries of the given Course Schedules.
+
+	:param course_schedules: Course Schedule names, existing or deleted
+	"""
+	course_schedules = list(course_schedules)
+	if not course_schedules:
+		return
+
+	frappe.db.delete("Student Timetable Entry", {"course_schedule": ("in", course_schedules)})
+	fields = get_schedule_fields()
+	schedules = get_schedules({"name": ("in", course_schedules)}, fields)
+	groups = get_schedule_groups(schedules)
+	students = get_active_group_students({g for names in groups.values() for g in names})
+	insert_timetable_entries(
+		fields,
+		[
+			(schedule, student_group, student)
+			for schedule in schedules
+			for student_group in groups[schedule.name]
+			for student in students.get(student_group, [])
+		],
+	)
+
+
+def update_timetable_for_group(student_group, students=None):
+	"""Rebuilds timetable entries of a Student Group.
+
+	:param student_group: Student Group
+	:param students: Only rebuild entries of these students
+	"""
+	filters = {"student_group": student_group}
+	if students is not None:
+		if not students:
+			return
+		filters["student"] = ("in", list(students))
+	frappe.db.delete("Student Timetable Entry", filters)
+
+	active = get_active_group_students([student_group]).get(student_group, [])
+	if students is not None:
+		active = [d for d in active if d in students]
+	if not active:
+		return
+
+	if frappe.get_meta("Course Schedule").has_field("student_group"):
+		schedule_filters = {"student_group": student_group}
+	else:
+		group = frappe.db.get_value(
+			"Student Group", student_group, ["course", "disabled"], as_dict=True
+		)
+		if not group or group.disabled or not group.course:
+			return
+		schedule_filters = {"course": group.course}
+
+	fields = get_schedule_fields()
+	insert_timetable_entries(
+		fields,
+		[
+			(schedule, student_group, student)
+			for schedule in get_schedules(schedule_filters, fields)
+			for student in active
+		],
+	)
+
+
+def get_active_group_students(student_groups):
+	"""Returns active students keyed by Student Group"""
+	students = {}
+	if not student_groups:
+		return students
+
+	for d in frappe.get_all(
+		"Student Group Student",
+		filters={"parent": ("in", list(student_groups)), "active": 1},
+		fields=["parent", "student"],
+	):
+		students.setdefault(d.parent, []).append(d.student)
+	return students
+
+
+def insert_timetable_entries(fields, rows):
+	"""Writes one entry per (Course Schedule, Student Group, student) with multi-row
+	inserts"""
+	if not rows:
+		return
+
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Student Timetable Entry",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"student",
+			"student_group",
+			"course_schedule",
+			*fields,
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				student,
+				student_group,
+				schedule.name,
+				*(schedule.get(f) for f in fields),
+			)
+			for schedule, student_group, student in rows
+		],
+	)
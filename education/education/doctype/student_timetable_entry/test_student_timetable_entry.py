@@ -0,0 +1,71 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from education.education.doctype.course_schedule.test_course_schedule import (
+	make_course_schedule_test_record,
+)
+from education.education.test_utils import (
+	create_academic_term,
+	create_academic_year,
+	create_course,
+	create_instructor,
+	create_program,
+	create_program_enrollment,
+	create_room,
+	create_student,
+	create_student_group,
+)
+
+
+class TestStudentTimetableEntry(FrappeTestCase):
+	def setUp(self):
+		create_academic_year()
+		create_academic_term(
+			term_name="Term 1", term_start_date="2023-04-01", term_end_date="2023-09-30"
+		)
+		create_program("Class 1")
+		self.student = create_student()
+		create_program_enrollment(student_name=self.student.name, submit=1)
+		create_instructor()
+		create_course()
+		create_room()
+		self.student_group = create_student_group(student_group_name="Test Student Group")
+		# schedules are attended by the groups of their course
+		self.student_group.course = "Test Course"
+		self.student_group.save()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_timetable_follows_schedule_and_group(self):
+		course_schedule = make_course_schedule_test_record(schedule_date="2023-08-01")
+		filters = {"course_schedule": course_schedule.name, "student": self.student.name}
+		self.assertTrue(frappe.db.exists("Student Timetable Entry", filters))
+
+		for d in self.student_group.students:
+			if d.student == self.student.name:
+				d.active = 0
+		self.student_group.save()
+		self.assertFalse(frappe.db.exists("Student Timetable Entry", filters))
+
+		self.student_group.reload()
+		for d in self.student_group.students:
+			d.active = 1
+		self.student_group.save()
+		self.assertTrue(frappe.db.exists("Student Timetable Entry", filters))
+
+		self.student_group.reload()
+		self.student_group.disabled = 1
+		self.student_group.save()
+		self.assertFalse(frappe.db.exists("Student Timetable Entry", filters))
+
+		self.student_group.reload()
+		self.student_group.disabled = 0
+		self.student_group.save()
+		self.assertTrue(frappe.db.exists("Student Timetable Entry", filters))
+
+		course_schedule.delete()
+		self.assertFalse(frappe.db.exists("Student Timetable Entry", filters))
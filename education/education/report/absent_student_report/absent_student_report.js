@@ -10,6 +10,22 @@ frappe.query_reports["Absent Student Report"] = {
 			"fieldtype": "Date",
 			"default": frappe.datetime.get_today(),
 			"reqd": 1
+		},
+		{
+			"fieldname":"to_date",
+			"label": __("To Date"),
+			"fieldtype": "Date"
 		}
-	]
+	],
+	onload: function(report) {
+		education.report_export.setup(report);
+		report.page.add_inner_button(__("Download CSV"), function() {
+			let filters = report.get_values();
+			if (!filters) return;
+			open_url_post(
+				"/api/method/education.education.report.absent_student_report.absent_student_report.download_absent_students",
+				{ date: filters.date, to_date: filters.to_date || "" }
+			);
+		});
+	}
 }
@@ -2,15 +2,27 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import csv
+import io
+
 import frappe
-from erpnext.setup.doctype.holiday_list.holiday_list import is_holiday
 from frappe import _, msgprint
-from frappe.utils import formatdate
+from frappe.utils import formatdate, getdate
+from werkzeug.wrappers import Response
 
 from education.education.doctype.student_attendance.student_attendance import (
 	get_holiday_list,
 )
 
+CSV_HEADER = (
+	"date",
+	"student",
+	"student_name",
+	"student_group",
+	"student_email_id",
+	"student_mobile_number",
+)
+
 
 def execute(filters=None):
 	if not filters:
@@ -19,46 +31,57 @@ def execute(filters=None):
 	if not filters.get("date"):
 		msgprint(_("Please select date"), raise_exception=1)
 
+	from_date, to_date = get_date_range(filters)
 	columns = get_columns(filters)
-	date = filters.get("date")
 
-	holiday_list = get_holiday_list()
-	if is_holiday(holiday_list, filters.get("date")):
+	holidays = frappe.get_all(
+		"Holiday",
+		filters={"parent": get_holiday_list(), "holiday_date": ("between", [from_date, to_date])},
+		pluck="holiday_date",
+		order_by="holiday_date",
+	)
+	if holidays:
 		msgprint(
 			_("No attendance has been marked for {0} as it is a Holiday").format(
-				frappe.bold(formatdate(filters.get("date")))
+				", ".join(frappe.bold(formatdate(d)) for d in holidays)
 			)
 		)
 
-	absent_students = get_absent_students(date)
-	leave_applicants = get_leave_applications(date)
-	if absent_students:
-		student_list = [d["student"] for d in absent_students]
-
-	data = []
-	for student in absent_students:
-		if not student.student in leave_applicants:
-			row = [student.student, student.student_name, student.student_group]
-			stud_details = frappe.db.get_value(
-				"Student",
-				student.student,
-				["student_email_id", "student_mobile_number"],
-				as_dict=True,
-			)
+	return columns, list(get_rows(from_date, to_date))
+
+
+def iter_execute(filters=None):
+	"""Same as `execute` with rows generated lazily, for background exports"""
+	if not filters:
+		filters = {}
 
-			if stud_details.student_email_id:
-				row += [stud_details.student_email_id]
-			else:
-				row += [""]
+	if not filters.get("date"):
+		msgprint(_("Please select date"), raise_exception=1)
+
+	from_date, to_date = get_date_range(filters)
+	return get_columns(filters), get_rows(from_date, to_date)
 
-			if stud_details.student_mobile_number:
-				row += [stud_details.student_mobile_number]
-			else:
-				row += [""]
 
-			data.append(row)
+def get_rows(from_date, to_date):
+	for d in get_absent_students(from_date, to_date):
+		row = [
+			d.student,
+			d.student_name,
+			d.student_group,
+			d.student_email_id or "",
+			d.student_mobile_number or "",
+		]
+		if from_date != to_date:
+			row.insert(0, d.date)
+		yield row
 
-	return columns, data
+
+def get_date_range(filters):
+	from_date = getdate(filters.get("date"))
+	to_date = getdate(filters.get("to_date") or from_date)
+	if to_date < from_date:
+		frappe.throw(_("To Date cannot be before Date"))
+	return from_date, to_date
 
 
 def get_columns(filters):
@@ -69,41 +92,65 @@ def get_columns(filters):
 		_("Student Email Address") + "::180",
 		_("Student Mobile No.") + "::150",
 	]
+	from_date, to_date = get_date_range(filters)
+	if from_date != to_date:
+		columns.insert(0, _("Date") + ":Date:100")
 	return columns
 
 
-def get_absent_students(date):
+def get_absent_students(from_date, to_date):
+	"""Returns absences between the dates with student contact details, leaving out
+	students whose leave application marks them present on that day"""
 	absent_students = frappe.db.sql(
 		"""
-		SELECT student, student_name, student_group
-		FROM `tabStudent Attendance`
+		SELECT
+			sa.date, sa.student, sa.student_name, sa.student_group,
+			s.student_email_id, s.student_mobile_number
+		FROM `tabStudent Attendance` sa
+		LEFT JOIN `tabStudent` s ON s.name = sa.student
 		WHERE
-			status='Absent' and docstatus=1 and date = %s
+			sa.status='Absent' and sa.docstatus=1 and sa.date between %(from_date)s and %(to_date)s
+			and not exists (
+				select la.name from `tabStudent Leave Application` la
+				where la.student = sa.student and la.docstatus = 1 and la.mark_as_present = 1
+					and la.from_date <= sa.date and la.to_date >= sa.date
+			)
 		ORDER BY
-			student_group, student_name""",
-		date,
+			sa.date, sa.student_group, sa.student_name""",
+		{"from_date": from_date, "to_date": to_date},
 		as_dict=1,
 	)
 	return absent_students
 
 
-def get_leave_applications(date):
-	leave_applicants = []
-	leave_applications = frappe.db.sql(
-		"""
-		SELECT student
-		FROM
-			`tabStudent Leave Application`
-		WHERE
-			docstatus = 1 and mark_as_present = 1 and
-			from_date <= %s and to_date >= %s
-	""",
-		(date, date),
-	)
-	for student in leave_applications:
-		leave_applicants.append(student[0])
-
-	return leave_applicants
+@frappe.whitelist()
+def download_absent_students(date, to_date=None):
+	"""Streams absences between the dates as CSV for the SMS/email notification run.
+
+	:param date: First date
+	:param to_date: Last date, same as `date` if not set
+	"""
+	frappe.has_permission("Student Attendance", "report", throw=True)
+	from_date, to_date = get_date_range({"date": date, "to_date": to_date})
+	absent_students = get_absent_students(from_date, to_date)
+
+	def generate():
+		buffer = io.StringIO()
+		writer = csv.writer(buffer)
+		writer.writerow(CSV_HEADER)
+		for i, d in enumerate(absent_students, 1):
+			writer.writerow([d.get(f) or "" for f in CSV_HEADER])
+			if not i % 500:
+				yield buffer.getvalue()
+				buffer.seek(0)
+				buffer.truncate()
+		yield buffer.getvalue()
+
+	response = Response(generate(), mimetype="text/csv")
+	response.headers[
+		"Content-Disposition"
+	] = 'attachment; filename="absent_students_{0}_{1}.csv"'.format(from_date, to_date)
+	return response
 
 
 def get_transportation_details(date, student_list):
@@ -36,5 +36,8 @@ frappe.query_reports["Course wise Assessment Report"] = {
 			"options": "Assessment Group",
 			"reqd": 1
 		}
-	]
+	],
+	onload: function(report) {
+		education.report_export.setup(report);
+	}
 };
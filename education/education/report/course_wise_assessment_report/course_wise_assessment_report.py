@@ -6,16 +6,18 @@ from collections import OrderedDict, defaultdict
 
 import frappe
 from frappe import _
-from frappe.desk.treeview import get_children
+
+from education.education.doctype.assessment_group.assessment_group import (
+	get_assessment_group_version,
+)
+
+_assessment_group_cache = {}
 
 
 def execute(filters=None):
 	data, chart = [], []
 
-	if filters.get("assessment_group") == "All Assessment Groups":
-		frappe.throw(
-			_("Please select the assessment group other than 'All Assessment Groups'")
-		)
+	validate_filters(filters)
 
 	data, criterias = get_data(filters)
 	columns = get_column(criterias)
@@ -24,12 +26,44 @@ def execute(filters=None):
 	return columns, data, None, chart
 
 
+def iter_execute(filters=None):
+	"""Same as `execute` without the chart and with rows generated lazily, for
+	background exports"""
+	validate_filters(filters)
+
+	values = get_formatted_result(filters)
+	criterias = get_criterias(values.get("assessment_result"))
+	return get_column(criterias), get_rows(values.get("assessment_result"))
+
+
+def validate_filters(filters):
+	if filters.get("assessment_group") == "All Assessment Groups":
+		frappe.throw(
+			_("Please select the assessment group other than 'All Assessment Groups'")
+		)
+
+
 def get_data(filters):
-	data = []
-	criterias = []
 	values = get_formatted_result(filters)
+	data = list(get_rows(values.get("assessment_result")))
+	criterias = get_criterias(values.get("assessment_result"))
+
+	return data, criterias
+
+
+def get_criterias(assessment_result):
+	criterias = []
+	for result in assessment_result:
+		for detail in result.details:
+			criteria = detail.get("assessment_criteria")
+			if not criteria in criterias:
+				criterias.append(criteria)
 
-	for result in values.get("assessment_result"):
+	return criterias
+
+
+def get_rows(assessment_result):
+	for result in assessment_result:
 		row = frappe._dict()
 		row.student = result.get("student")
 		row.student_name = result.get("student_name")
@@ -38,15 +72,20 @@ def get_data(filters):
 			criteria = detail.get("assessment_criteria")
 			row[frappe.scrub(criteria)] = detail.get("grade")
 			row[frappe.scrub(criteria) + "_score"] = detail.get("score")
-			if not criteria in criterias:
-				criterias.append(criteria)
-
-		data.append(row)
 
-	return data, criterias
+		yield row
 
 
 def get_formatted_result(args, get_course=False):
+	"""Returns submitted Assessment Results matching the filters, each with its
+	Assessment Result Details in `details`.
+
+	Details of all results are fetched with a single query and grouped by parent.
+
+	:param args: filters, see `prepare_filters`
+	:param get_course: also return the courses of the results
+	:return: dict with `assessment_result` and `courses`
+	"""
 	courses = []
 	filters = prepare_filters(args)
 
@@ -65,18 +104,20 @@ def get_formatted_result(args, get_course=False):
 		order_by="",
 	)
 
+	details = {}
+	if assessment_result:
+		for detail in frappe.get_all(
+			"Assessment Result Detail",
+			{"parent": ("in", [result.name for result in assessment_result])},
+			["parent", "assessment_criteria", "maximum_score", "grade", "score"],
+		):
+			details.setdefault(detail.pop("parent"), []).append(detail)
+
 	for result in assessment_result:
 		if get_course and result.course not in courses:
 			courses.append(result.course)
 
-		details = frappe.get_all(
-			"Assessment Result Detail",
-			{
-				"parent": result.name,
-			},
-			["assessment_criteria", "maximum_score", "grade", "score"],
-		)
-		result.update({"details": details})
+		result.update({"details": details.get(result.name, [])})
 
 	return {"assessment_result": assessment_result, "courses": courses}
 
@@ -160,15 +201,30 @@ def get_chart(data, criterias):
 
 
 def get_child_assessment_groups(assessment_group):
-	assessment_groups = []
-	group_type = frappe.get_value("Assessment Group", assessment_group, "is_group")
-	if group_type:
-
-		assessment_groups = [
-			d.get("value")
-			for d in get_children("Assessment Group", assessment_group)
-			if d.get("value") and not d.get("expandable")
-		]
-	else:
-		assessment_groups = [assessment_group]
-	return assessment_groups
+	"""Returns the leaf Assessment Groups directly under a group, or the group itself
+	if it is not a group.
+
+	Results are kept per process and site until the Assessment Group tree changes.
+	"""
+	version = get_assessment_group_version()
+	cached = _assessment_group_cache.get(frappe.local.site)
+	if not cached or cached[0] != version:
+		cached = (version, {})
+		_assessment_group_cache[frappe.local.site] = cached
+
+	if assessment_group not in cached[1]:
+		cached[1][assessment_group] = load_child_assessment_groups(assessment_group)
+
+	return list(cached[1][assessment_group])
+
+
+def load_child_assessment_groups(assessment_group):
+	if not frappe.db.get_value("Assessment Group", assessment_group, "is_group"):
+		return [assessment_group]
+
+	return frappe.get_all(
+		"Assessment Group",
+		filters={"parent_assessment_group": assessment_group, "is_group": 0},
+		pluck="name",
+		order_by="name",
+	)
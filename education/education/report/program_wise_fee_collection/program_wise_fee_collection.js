@@ -18,5 +18,8 @@ frappe.query_reports["Program wise Fee Collection"] = {
 			"default": frappe.datetime.get_today(),
 			"reqd": 1
 		}
-	]
+	],
+	onload: function(report) {
+		education.report_export.setup(report);
+	}
 };
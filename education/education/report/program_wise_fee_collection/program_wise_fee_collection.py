@@ -19,6 +19,14 @@ def execute(filters=None):
 	return columns, data, None, chart
 
 
+def iter_execute(filters=None):
+	"""Same as `execute` without the chart, for background exports"""
+	if not filters:
+		filters = {}
+
+	return get_columns(filters), get_data(filters)
+
+
 def get_columns(filters=None):
 	return [
 		{
@@ -25,5 +25,8 @@ frappe.query_reports["Student and Guardian Contact Details"] = {
 			"reqd": 1
 		},
 
-	]
+	],
+	onload: function(report) {
+		education.report_export.setup(report);
+	}
 }
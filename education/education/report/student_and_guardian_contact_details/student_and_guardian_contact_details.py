@@ -7,8 +7,12 @@ from frappe import _
 
 
 def execute(filters=None):
-	columns, data = [], []
+	columns, rows = iter_execute(filters)
+	return columns, list(rows)
 
+
+def iter_execute(filters=None):
+	"""Same as `execute` with rows generated lazily, for background exports"""
 	academic_year = filters.get("academic_year")
 	program = filters.get("program")
 	student_batch_name = filters.get("student_batch_name")
@@ -33,6 +37,10 @@ def execute(filters=None):
 	student_map = get_student_details(student_list)
 	guardian_map = get_guardian_map(student_list)
 
+	return columns, get_rows(program_enrollments, group_roll_no_map, student_map, guardian_map)
+
+
+def get_rows(program_enrollments, group_roll_no_map, student_map, guardian_map):
 	for d in program_enrollments:
 		student_details = student_map.get(d.student, {})
 
@@ -55,9 +63,7 @@ def execute(filters=None):
 			row[f"guardian{i+1}_mobile_no"] = g.mobile_number
 			row[f"guardian{i+1}_email_id"] = g.email_address
 
-		data.append(row)
-
-	return columns, data
+		yield row
 
 
 def get_columns():
@@ -8,5 +8,10 @@ frappe.query_reports["Student Batch-Wise Attendance"] = {
 		"fieldtype": "Date",
 		"default": frappe.datetime.get_today(),
 		"reqd": 1
+	},
+	{
+		"fieldname": "to_date",
+		"label": __("To Date"),
+		"fieldtype": "Date"
 	}]
 }
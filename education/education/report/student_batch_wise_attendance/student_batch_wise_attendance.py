@@ -3,9 +3,8 @@
 
 
 import frappe
-from erpnext.setup.doctype.holiday_list.holiday_list import is_holiday
 from frappe import _, msgprint
-from frappe.utils import formatdate
+from frappe.utils import add_days, date_diff, formatdate, getdate
 
 from education.education.doctype.student_attendance.student_attendance import (
 	get_holiday_list,
@@ -19,51 +18,58 @@ def execute(filters=None):
 	if not filters.get("date"):
 		msgprint(_("Please select date"), raise_exception=1)
 
-	holiday_list = get_holiday_list()
-	if is_holiday(holiday_list, filters.get("date")):
+	from_date = getdate(filters.get("date"))
+	to_date = getdate(filters.get("to_date") or from_date)
+	if to_date < from_date:
+		msgprint(_("To Date cannot be before Date"), raise_exception=1)
+
+	holidays = get_holidays(get_holiday_list(), from_date, to_date)
+	if holidays:
 		msgprint(
 			_("No attendance has been marked for {0} as it is a Holiday").format(
-				frappe.bold(formatdate(filters.get("date")))
+				", ".join(frappe.bold(formatdate(d)) for d in holidays)
 			)
 		)
 
 	columns = get_columns(filters)
-
-	active_student_group = get_active_student_group()
+	dates = [add_days(from_date, i) for i in range(date_diff(to_date, from_date) + 1)]
 
 	data = []
-	for student_group in active_student_group:
-		present_students = 0
-		absent_students = 0
-		leave_students = 0
-		student_group_strength = get_student_group_strength(student_group.name)
-		student_attendance = get_student_attendance(student_group.name, filters.get("date"))
-		if student_attendance:
-			for attendance in student_attendance:
-				if attendance.status == "Present":
-					present_students = attendance.count
-				elif attendance.status == "Absent":
-					absent_students = attendance.count
-				elif attendance.status == "Leave":
-					leave_students = attendance.count
-
-		unmarked_students = student_group_strength - (
-			present_students + absent_students + leave_students
-		)
-		row = {
-			"student_group": student_group.name,
-			"student_group_strength": student_group_strength,
-			"present_students": present_students,
-			"absent_students": absent_students,
-			"leave_students": leave_students,
-			"unmarked_students": unmarked_students,
-		}
-		data.append(row)
+	for student_group, strength, attendance in get_student_group_attendance(from_date, to_date):
+		for date in dates:
+			counts = attendance.get(date, {})
+			present_students = counts.get("Present", 0)
+			absent_students = counts.get("Absent", 0)
+			leave_students = counts.get("Leave", 0)
+
+			row = {
+				"student_group": student_group,
+				"student_group_strength": strength,
+				"present_students": present_students,
+				"absent_students": absent_students,
+				"leave_students": leave_students,
+				"unmarked_students": strength
+				- (present_students + absent_students + leave_students),
+			}
+			if len(dates) > 1:
+				row["date"] = date
+			data.append(row)
 	return columns, data
 
 
 def get_columns(filters):
-	columns = [
+	columns = []
+	if filters.get("to_date") and getdate(filters.get("to_date")) > getdate(filters.get("date")):
+		columns.append(
+			{
+				"label": _("Date"),
+				"fieldname": "date",
+				"fieldtype": "Date",
+				"width": 100,
+			}
+		)
+
+	columns += [
 		{
 			"label": _("Student Group"),
 			"fieldname": "student_group",
@@ -99,31 +105,46 @@ def get_columns(filters):
 	return columns
 
 
-def get_active_student_group():
-	active_student_groups = frappe.db.sql(
-		"""select name from `tabStudent Group` where group_based_on = "Batch"
-		and academic_year=%s order by name""",
-		(frappe.defaults.get_defaults().academic_year),
+def get_student_group_attendance(from_date, to_date):
+	"""Returns (student group, strength, {date: {status: count}}) for every active batch
+	Student Group, using one query for strength and attendance of all groups"""
+	rows = frappe.db.sql(
+		"""select sg.name as student_group, ifnull(strength.count, 0) as strength,
+			att.date, att.status, att.count
+		from `tabStudent Group` sg
+		left join (
+			select parent, count(*) as count from `tabStudent Group Student`
+			where active=1 group by parent
+		) strength on strength.parent = sg.name
+		left join (
+			select student_group, date, status, count(*) as count from `tabStudent Attendance`
+			where date between %(from_date)s and %(to_date)s and docstatus = 1
+				and (course_schedule is Null or course_schedule='')
+			group by student_group, date, status
+		) att on att.student_group = sg.name
+		where sg.group_based_on = "Batch" and sg.academic_year=%(academic_year)s
+		order by sg.name""",
+		{
+			"from_date": from_date,
+			"to_date": to_date,
+			"academic_year": frappe.defaults.get_defaults().academic_year,
+		},
 		as_dict=1,
 	)
-	return active_student_groups
 
+	student_groups = {}
+	for d in rows:
+		_strength, attendance = student_groups.setdefault(d.student_group, (d.strength, {}))
+		if d.date:
+			attendance.setdefault(d.date, {})[d.status] = d.count
 
-def get_student_group_strength(student_group):
-	student_group_strength = frappe.db.sql(
-		"""select count(*) from `tabStudent Group Student`
-		where parent = %s and active=1""",
-		student_group,
-	)[0][0]
-	return student_group_strength
+	return [(name, strength, attendance) for name, (strength, attendance) in student_groups.items()]
 
 
-def get_student_attendance(student_group, date):
-	student_attendance = frappe.db.sql(
-		"""select count(*) as count, status from `tabStudent Attendance` where
-				student_group= %s and date= %s and docstatus = 1 and
-				(course_schedule is Null or course_schedule='') group by status""",
-		(student_group, date),
-		as_dict=1,
+def get_holidays(holiday_list, from_date, to_date):
+	return frappe.get_all(
+		"Holiday",
+		filters={"parent": holiday_list, "holiday_date": ("between", [from_date, to_date])},
+		pluck="holiday_date",
+		order_by="holiday_date",
 	)
-	return student_attendance
@@ -27,7 +27,52 @@ frappe.query_reports["Student Monthly Attendance Sheet"] = {
 		"reqd": 1
 	}
 	],
-	onload: function() {
+	onload: function(report) {
+		education.report_export.setup(report);
+		report.page.add_inner_button(__("Export Multiple Groups"), function() {
+			let dialog = new frappe.ui.Dialog({
+				title: __("Export Attendance Sheets"),
+				fields: [
+					{
+						fieldname: "student_groups",
+						label: __("Student Groups"),
+						fieldtype: "MultiSelectList",
+						reqd: 1,
+						get_data: function(txt) {
+							return frappe.db.get_link_options("Student Group", txt);
+						}
+					},
+					{
+						fieldname: "from_date",
+						label: __("From Month"),
+						fieldtype: "Date",
+						reqd: 1,
+						default: frappe.datetime.month_start()
+					},
+					{
+						fieldname: "to_date",
+						label: __("To Month"),
+						fieldtype: "Date",
+						reqd: 1,
+						default: frappe.datetime.month_end()
+					}
+				],
+				primary_action_label: __("Export"),
+				primary_action: function(values) {
+					open_url_post(
+						"/api/method/education.education.report.student_monthly_attendance_sheet.student_monthly_attendance_sheet.export_attendance_sheets",
+						{
+							student_groups: JSON.stringify(values.student_groups),
+							from_date: values.from_date,
+							to_date: values.to_date
+						}
+					);
+					dialog.hide();
+				}
+			});
+			dialog.show();
+		});
+
 		return  frappe.call({
 			// method: "hrms.hr.report.monthly_attendance_sheet.monthly_attendance_sheet.get_attendance_years",
 			method: "education.education.report.student_monthly_attendance_sheet.student_monthly_attendance_sheet.get_year_list",
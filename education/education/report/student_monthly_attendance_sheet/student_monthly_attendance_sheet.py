@@ -2,71 +2,136 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import json
+
 import frappe
-from erpnext.support.doctype.issue.issue import get_holidays
 from frappe import _
-from frappe.utils import add_days, cstr, date_diff, get_first_day, get_last_day, getdate
+from frappe.utils import add_months, cstr, date_diff, get_first_day, get_last_day, getdate
+from frappe.utils.xlsxutils import make_xlsx
 
-from education.education.api import get_student_group_students
 from education.education.doctype.student_attendance.student_attendance import (
 	get_holiday_list,
 )
 
+# Status codes stored in the student x day grid, indexed by STATUS_LABELS
+NONE, PRESENT, ABSENT, LEAVE, HOLIDAY, INACTIVE = range(6)
+STATUS_LABELS = ("", "P", "A", "L", "H", "-")
+STATUS_CODES = {"Present": PRESENT, "Absent": ABSENT, "Leave": LEAVE}
+
 
 def execute(filters=None):
+	columns, rows = iter_execute(filters)
+	return columns, list(rows)
+
+
+def iter_execute(filters=None):
+	"""Same as `execute` with rows generated lazily, for background exports"""
 	if not filters:
 		filters = {}
 
 	from_date = get_first_day(filters["month"] + "-" + filters["year"])
 	to_date = get_last_day(filters["month"] + "-" + filters["year"])
-	total_days_in_month = date_diff(to_date, from_date) + 1
-	columns = get_columns(total_days_in_month)
-	students = get_student_group_students(filters.get("student_group"), 1)
-	students_list = get_students_list(students)
-	att_map = get_attendance_list(
-		from_date, to_date, filters.get("student_group"), students_list
+	columns = get_columns(date_diff(to_date, from_date) + 1)
+
+	sheet = get_attendance_sheets([filters.get("student_group")], from_date, to_date)[0]
+	return columns, get_sheet_rows(sheet)
+
+
+def get_attendance_sheets(student_groups, from_date, to_date):
+	"""Returns one attendance sheet per Student Group and month between the dates.
+
+	Students, their enabled flags, attendance, leave applications and holidays
+	for all groups and months are loaded with one query each. Every sheet keeps
+	its statuses in a flat student x day `bytearray` of status codes.
+
+	:param student_groups: Student Groups
+	:param from_date: First day of the first month
+	:param to_date: Last day of the last month
+	:return: list of `frappe._dict(student_group, month_start, days, students, grid)`
+	"""
+	from_date, to_date = getdate(from_date), getdate(to_date)
+	students = get_students(student_groups)
+	all_students = list({d.student for rows in students.values() for d in rows})
+
+	enabled = dict(
+		frappe.get_all(
+			"Student",
+			filters={"name": ("in", all_students or [""])},
+			fields=["name", "enabled"],
+			as_list=True,
+		)
+	)
+	attendance = get_attendance(student_groups, from_date, to_date)
+	leave_windows = get_leave_windows(all_students, from_date, to_date)
+	holidays = get_holidays(from_date, to_date)
+
+	sheets = []
+	for student_group in student_groups:
+		month_start = get_first_day(from_date)
+		while month_start <= to_date:
+			month_end = get_last_day(month_start)
+			sheets.append(
+				make_sheet(
+					student_group,
+					month_start,
+					date_diff(month_end, month_start) + 1,
+					students.get(student_group, []),
+					enabled,
+					attendance.get((student_group, month_start), []),
+					leave_windows,
+					[d.day - 1 for d in holidays if month_start <= d <= month_end],
+				)
+			)
+			month_start = add_months(month_start, 1)
+
+	return sheets
+
+
+def make_sheet(
+	student_group, month_start, days, students, enabled, attendance, leave_windows, holidays
+):
+	grid = bytearray(len(students) * days)
+	index = {d.student: i for i, d in enumerate(students)}
+	with_attendance = {d.student for d in attendance}
+
+	for i, d in enumerate(students):
+		if holidays:
+			for day in holidays:
+				grid[i * days + day] = HOLIDAY
+		elif d.student not in with_attendance and not enabled.get(d.student):
+			grid[i * days : (i + 1) * days] = bytes([INACTIVE]) * days
+
+	for d in attendance:
+		i = index.get(d.student)
+		if i is None:
+			continue
+
+		if any(start <= d.date <= end for start, end in leave_windows.get(d.student, ())):
+			status = PRESENT
+		else:
+			status = STATUS_CODES.get(d.status, NONE)
+		grid[i * days + d.date.day - 1] = status
+
+	return frappe._dict(
+		student_group=student_group,
+		month_start=month_start,
+		days=days,
+		students=students,
+		grid=grid,
 	)
-	data = []
-
-	for stud in students:
-		student_status = frappe.db.get_value("Student", stud.student, "enabled")
-		date = from_date
-		total_present = total_absent = total_leave = 0.0
-		row = {"student": stud.student, "student_name": stud.student_name}
-		status_map = {
-			"Present": "P",
-			"Absent": "A",
-			"None": "",
-			"Inactive": "-",
-			"Holiday": "H",
-			"Leave": "L",
-		}
-		for day in range(total_days_in_month):
-			status = "None"
-
-			if att_map.get(stud.student):
-				status = att_map.get(stud.student).get(date, "None")
-			elif not student_status:
-				status = "Inactive"
-			else:
-				status = "None"
-
-			if status == "Present":
-				total_present += 1
-			elif status == "Absent":
-				total_absent += 1
-			elif status == "Leave":
-				total_leave += 1
-			date = add_days(date, 1)
-			row[cstr(day + 1)] = status_map[status]
-		row = {
-			**row,
-			"Total Present": total_present,
-			"Total Leave": total_leave,
-			"Total Absent": total_absent,
-		}
-		data.append(row)
-	return columns, data
+
+
+def get_sheet_rows(sheet):
+	for i, d in enumerate(sheet.students):
+		statuses = sheet.grid[i * sheet.days : (i + 1) * sheet.days]
+		row = {"student": d.student, "student_name": d.student_name}
+		for day, status in enumerate(statuses):
+			row[cstr(day + 1)] = STATUS_LABELS[status]
+
+		row["Total Present"] = statuses.count(PRESENT)
+		row["Total Leave"] = statuses.count(LEAVE)
+		row["Total Absent"] = statuses.count(ABSENT)
+		yield row
 
 
 def get_columns(days_in_month):
@@ -118,46 +183,42 @@ def get_columns(days_in_month):
 	return columns
 
 
-def get_students_list(students):
-	student_list = []
-	for stud in students:
-		student_list.append(stud.student)
-	return student_list
+def get_students(student_groups):
+	"""Returns active and inactive students keyed by Student Group in roll number order"""
+	students = {}
+	for d in frappe.get_all(
+		"Student Group Student",
+		fields=["parent", "student", "student_name"],
+		filters={"parent": ("in", student_groups)},
+		order_by="parent, group_roll_number",
+	):
+		students.setdefault(d.parent, []).append(d)
+
+	return students
 
 
-def get_attendance_list(from_date, to_date, student_group, students_list):
-	attendance_list = frappe.db.sql(
-		"""select student, date, status
-		from `tabStudent Attendance` where student_group = %s
+def get_attendance(student_groups, from_date, to_date):
+	"""Returns submitted attendance keyed by (Student Group, first day of month)"""
+	attendance = {}
+	for d in frappe.db.sql(
+		"""select student_group, student, date, status
+		from `tabStudent Attendance` where student_group in %s
 		and docstatus = 1
 		and date between %s and %s
 		order by student, date""",
-		(student_group, from_date, to_date),
+		(student_groups, from_date, to_date),
 		as_dict=1,
-	)
-
-	att_map = {}
-	students_with_leave_application = get_students_with_leave_application(
-		from_date, to_date, students_list
-	)
-	for d in attendance_list:
-		att_map.setdefault(d.student, frappe._dict()).setdefault(d.date, "")
-
-		if students_with_leave_application.get(
-			d.date
-		) and d.student in students_with_leave_application.get(d.date):
-			att_map[d.student][d.date] = "Present"
-		else:
-			att_map[d.student][d.date] = d.status
+	):
+		attendance.setdefault((d.student_group, get_first_day(d.date)), []).append(d)
 
-	att_map = mark_holidays(att_map, from_date, to_date, students_list)
+	return attendance
 
-	return att_map
 
+def get_leave_windows(students, from_date, to_date):
+	"""Returns (from_date, to_date) of leave applications marked as present, keyed by student"""
+	if not students:
+		return {}
 
-def get_students_with_leave_application(from_date, to_date, students_list):
-	if not students_list:
-		return
 	leave_applications = frappe.db.sql(
 		"""
 		select student, from_date, to_date
@@ -165,47 +226,65 @@ def get_students_with_leave_application(from_date, to_date, students_list):
 		where
 			mark_as_present = 1 and docstatus = 1
 			and student in %(students)s
-			and (
-				from_date between %(from_date)s and %(to_date)s
-				or to_date between %(from_date)s and %(to_date)s
-				or (%(from_date)s between from_date and to_date and %(to_date)s between from_date and to_date)
-			)
+			and from_date <= %(to_date)s and to_date >= %(from_date)s
 		""",
-		{"students": students_list, "from_date": from_date, "to_date": to_date},
+		{"students": students, "from_date": from_date, "to_date": to_date},
 		as_dict=True,
 	)
-	students_with_leaves = {}
-	for application in leave_applications:
-		for date in daterange(application.from_date, application.to_date):
-			students_with_leaves.setdefault(date, []).append(application.student)
 
-	return students_with_leaves
+	leave_windows = {}
+	for d in leave_applications:
+		leave_windows.setdefault(d.student, []).append((d.from_date, d.to_date))
 
+	return leave_windows
 
-def daterange(d1, d2):
-	import datetime
-
-	return (d1 + datetime.timedelta(days=i) for i in range((d2 - d1).days + 1))
 
+def get_holidays(from_date, to_date):
+	return frappe.get_all(
+		"Holiday",
+		filters={
+			"parent": get_holiday_list(),
+			"holiday_date": ("between", [from_date, to_date]),
+		},
+		pluck="holiday_date",
+	)
 
-def mark_holidays(att_map, from_date, to_date, students_list):
-	holiday_list = get_holiday_list()
-	holidays = get_holidays(holiday_list)
 
-	for dt in daterange(getdate(from_date), getdate(to_date)):
-		if dt in holidays:
-			for student in students_list:
-				att_map.setdefault(student, frappe._dict()).setdefault(dt, "Holiday")
+@frappe.whitelist()
+def export_attendance_sheets(student_groups, from_date, to_date):
+	"""Downloads the monthly attendance sheets of several Student Groups and months
+	as one Excel file, with a row per student, group and month.
+
+	:param student_groups: Student Groups (JSON list)
+	:param from_date: Any date in the first month
+	:param to_date: Any date in the last month
+	"""
+	frappe.has_permission("Student Attendance", "report", throw=True)
+	if isinstance(student_groups, str):
+		student_groups = json.loads(student_groups)
+	if not student_groups:
+		frappe.throw(_("Please select at least one Student Group"))
+
+	columns = get_columns(31)
+	data = [[_("Student Group"), _("Month")] + [c["label"] for c in columns]]
+	for sheet in get_attendance_sheets(
+		student_groups, get_first_day(from_date), get_last_day(to_date)
+	):
+		for row in get_sheet_rows(sheet):
+			data.append(
+				[sheet.student_group, sheet.month_start.strftime("%Y-%m")]
+				+ [row.get(c["fieldname"], "") for c in columns]
+			)
 
-	return att_map
+	xlsx_file = make_xlsx(data, "Attendance Sheets")
+	frappe.response["filename"] = "Student Monthly Attendance Sheets.xlsx"
+	frappe.response["filecontent"] = xlsx_file.getvalue()
+	frappe.response["type"] = "binary"
 
 
 @frappe.whitelist()
 def get_year_list():
-	all_academic_years = frappe.db.get_list("Student Attendance", pluck="date")
-
-	year_list = [date.year for date in all_academic_years if date]
-	year_list = list(set(year_list))
-	year_list.sort()
-
-	return year_list
+	return frappe.db.sql_list(
+		"""select distinct year(date) from `tabStudent Attendance`
+		where date is not null order by 1"""
+	)
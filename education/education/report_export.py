@@ -0,0 +1,208 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Background CSV/XLSX export of large query reports.
+
+A report opts in by exposing `iter_execute(filters)` next to `execute` in its
+module. It returns `(columns, rows)` like `execute`, except that `rows` may be
+any iterable of dicts or lists, so rows can be generated while they are written
+to the file instead of being collected in a list first.
+"""
+
+import csv
+import datetime
+import os
+
+import frappe
+from frappe import _
+from frappe.desk.query_report import get_report_doc, get_report_module_dotted_path
+from frappe.utils import cstr, now_datetime
+from frappe.utils.background_jobs import enqueue
+
+REPORT_EXPORT_METHOD = "iter_execute"
+REPORT_EXPORT_FORMATS = ("CSV", "Excel")
+
+
+@frappe.whitelist()
+def export_report(report_name, filters=None, file_format="CSV"):
+	"""Enqueues a file export of a report that supports streaming.
+
+	:param report_name: Report
+	:param filters: Report filters (dict or JSON)
+	:param file_format: `CSV` or `Excel`
+	"""
+	if file_format not in REPORT_EXPORT_FORMATS:
+		frappe.throw(_("Unsupported export format {0}").format(file_format))
+
+	report = get_report_doc(report_name)
+	get_row_generator(report)
+
+	enqueue(
+		build_report_export,
+		queue="long",
+		timeout=3600,
+		now=frappe.flags.in_test,
+		report_name=report.name,
+		filters=frappe.parse_json(filters or "{}"),
+		file_format=file_format,
+	)
+	frappe.msgprint(
+		_(
+			"{0} is being exported in the background. You will be notified once the file is ready."
+		).format(frappe.bold(_(report.name))),
+		alert=True,
+	)
+
+
+def get_row_generator(report):
+	"""Returns the `iter_execute` function of a report, throws if the report has none"""
+	method = None
+	if report.report_type == "Script Report" and report.is_standard == "Yes":
+		module = frappe.get_module(get_report_module_dotted_path(report.module, report.name))
+		method = getattr(module, REPORT_EXPORT_METHOD, None)
+
+	if not method:
+		frappe.throw(
+			_("Report {0} does not support background export").format(frappe.bold(report.name))
+		)
+
+	return method
+
+
+def build_report_export(report_name, filters, file_format="CSV"):
+	"""Runs the report's row generator and writes the rows to a private File, then
+	notifies the user who requested the export. If the report or the writer fails,
+	the partial file is removed, the error is logged and the user is told so."""
+	report = get_report_doc(report_name)
+	extension = "xlsx" if file_format == "Excel" else "csv"
+	file_name = "{0}_{1}_{2}.{3}".format(
+		frappe.scrub(report.name),
+		now_datetime().strftime("%Y%m%d"),
+		frappe.generate_hash(length=8),
+		extension,
+	)
+	path = frappe.get_site_path("private", "files", file_name)
+
+	try:
+		columns, rows = get_row_generator(report)(frappe._dict(filters))
+		columns = get_export_columns(columns)
+		if file_format == "Excel":
+			write_xlsx(path, report.name, columns, rows)
+		else:
+			write_csv(path, columns, rows)
+	except Exception:
+		if os.path.exists(path):
+			os.remove(path)
+		frappe.log_error(
+			title=_("Export of {0} failed").format(report.name),
+			reference_doctype="Report",
+			reference_name=report.name,
+		)
+		notify_report_export_failed(report.name)
+		return
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": "/private/files/" + file_name,
+			"is_private": 1,
+			"attached_to_doctype": "Report",
+			"attached_to_name": report.name,
+		}
+	).insert(ignore_permissions=True)
+
+	notify_report_export(report.name, file)
+	return file.name
+
+
+def get_export_columns(columns):
+	"""Returns `(label, fieldname)` of report columns given as dicts or
+	`Label:Fieldtype/Options:Width` strings"""
+	export_columns = []
+	for column in columns:
+		if isinstance(column, str):
+			label = column.split(":")[0]
+			export_columns.append((label, frappe.scrub(label)))
+		else:
+			label = column.get("label") or column.get("fieldname")
+			export_columns.append((label, column.get("fieldname") or frappe.scrub(label)))
+
+	return export_columns
+
+
+def get_export_values(columns, row):
+	"""Returns the cells of a row in column order"""
+	if isinstance(row, dict):
+		return [row.get(fieldname) for label, fieldname in columns]
+	return list(row)[: len(columns)]
+
+
+def write_csv(path, columns, rows):
+	with open(path, "w", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		writer.writerow([label for label, fieldname in columns])
+		for row in rows:
+			writer.writerow([cstr(value) for value in get_export_values(columns, row)])
+
+
+def write_xlsx(path, sheet_name, columns, rows):
+	from openpyxl import Workbook
+	from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+	# write-only workbooks flush rows to disk as they are appended
+	workbook = Workbook(write_only=True)
+	sheet = workbook.create_sheet(sheet_name[:31])
+	sheet.append([label for label, fieldname in columns])
+
+	for row in rows:
+		values = []
+		for value in get_export_values(columns, row):
+			if not isinstance(value, (int, float, datetime.date, datetime.datetime)):
+				value = ILLEGAL_CHARACTERS_RE.sub("", cstr(value))
+			values.append(value)
+		sheet.append(values)
+
+	workbook.save(path)
+
+
+def notify_report_export(report_name, file):
+	from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+
+	subject = _("Export of {0} is ready").format(frappe.bold(_(report_name)))
+	enqueue_create_notification(
+		frappe.session.user,
+		{
+			"type": "Alert",
+			"document_type": "File",
+			"document_name": file.name,
+			"subject": subject,
+			"from_user": frappe.session.user,
+		},
+	)
+	frappe.publish_realtime(
+		"report_export_ready",
+		{"report_name": report_name, "file_url": file.file_url, "file_name": file.file_name},
+		user=frappe.session.user,
+	)
+
+
+def notify_report_export_failed(report_name):
+	from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+
+	subject = _("Export of {0} failed, see the Error Log for details").format(
+		frappe.bold(_(report_name))
+	)
+	enqueue_create_notification(
+		frappe.session.user,
+		{
+			"type": "Alert",
+			"document_type": "Report",
+			"document_name": report_name,
+			"subject": subject,
+			"from_user": frappe.session.user,
+		},
+	)
+	frappe.publish_realtime(
+		"report_export_failed", {"report_name": report_name}, user=frappe.session.user
+	)
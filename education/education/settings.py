@@ -0,0 +1,47 @@
+# Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""Cached accessor for the Education Settings single.
+
+Settings are loaded once per process and site and re-validated once per request
+against a version key in the site cache, so hot paths like fee generation do not
+query the database for settings. `EducationSettings.on_update` drops the cache.
+"""
+
+import frappe
+
+SETTINGS_VERSION_KEY = "education_settings_version"
+
+_settings_cache = {}
+
+
+def get_education_settings():
+	"""Returns all Education Settings fields as a dict.
+
+	Returns:
+	        frappe._dict: Education Settings values keyed by fieldname
+	"""
+	settings = getattr(frappe.local, "education_settings", None)
+	if settings is not None:
+		return settings
+
+	version = frappe.cache().get_value(SETTINGS_VERSION_KEY)
+	cached = _settings_cache.get(frappe.local.site)
+	if version and cached and cached[0] == version:
+		settings = cached[1]
+	else:
+		settings = frappe._dict(frappe.get_single("Education Settings").as_dict())
+		if not version:
+			version = frappe.generate_hash(length=10)
+			frappe.cache().set_value(SETTINGS_VERSION_KEY, version)
+		_settings_cache[frappe.local.site] = (version, settings)
+
+	frappe.local.education_settings = settings
+	return settings
+
+
+def clear_education_settings_cache():
+	"""Drops cached Education Settings in this process and invalidates other processes."""
+	_settings_cache.pop(frappe.local.site, None)
+	frappe.local.education_settings = None
+	frappe.cache().delete_value(SETTINGS_VERSION_KEY)
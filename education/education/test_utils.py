@@ -244,15 +244,27 @@ def create_room(room_name="Test Room"):
 		room.save()
 
 
-def create_grading_scale(grading_scale_name="_Test Grading Scale"):
+def create_grading_scale(grading_scale_name="_Test Grading Scale", grades=None):
 	if frappe.db.exists("Grading Scale", grading_scale_name):
 		return
 
 	grading_scale = frappe.new_doc("Grading Scale")
 	grading_scale.grading_scale_name = grading_scale_name
-	grades = {"A": 80, "B": 70, "C": 60, "D": 50, "F": 0}
+	grades = grades or {"A": 80, "B": 70, "C": 60, "D": 50, "F": 0}
 	for grade, threshold in grades.items():
 		grading_scale.append("intervals", {"grade_code": grade, "threshold": threshold})
 
 	grading_scale.save()
 	grading_scale.submit()
+
+
+def create_assessment_group(
+	assessment_group_name, parent_assessment_group="All Assessment Groups", is_group=0
+):
+	if not frappe.db.exists("Assessment Group", assessment_group_name):
+		assessment_group = frappe.new_doc("Assessment Group")
+		assessment_group.assessment_group_name = assessment_group_name
+		assessment_group.parent_assessment_group = parent_assessment_group
+		assessment_group.is_group = is_group
+		assessment_group.save()
+	return assessment_group_name
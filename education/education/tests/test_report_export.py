@@ -0,0 +1,109 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import csv
+import os
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from education.education.doctype.student_leave_application.test_student_leave_application import (
+	create_holiday_list,
+	create_student_attendance,
+)
+from education.education.report_export import build_report_export
+from education.education.test_utils import (
+	create_academic_term,
+	create_academic_year,
+	create_program,
+	create_program_enrollment,
+	create_student,
+	create_student_group,
+)
+
+REPORT_NAME = "Absent Student Report"
+HEADER = [
+	"Student",
+	"Student Name",
+	"Student Group",
+	"Student Email Address",
+	"Student Mobile No.",
+]
+
+
+class TestReportExport(FrappeTestCase):
+	def setUp(self):
+		create_holiday_list()
+		create_academic_year()
+		create_academic_term(
+			term_name="Term 1", term_start_date="2023-04-01", term_end_date="2023-09-30"
+		)
+		create_program()
+		student = create_student()
+		create_program_enrollment(student_name=student.name, submit=1)
+		create_student_group()
+
+		self.attendance = create_student_attendance(status="Absent")
+		self.attendance.submit()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_expected_row(self):
+		return [
+			self.attendance.student,
+			self.attendance.student_name,
+			"Test Student Group",
+			"test@example.com",
+			"",
+		]
+
+	def export(self, filters, file_format="CSV"):
+		file_name = build_report_export(REPORT_NAME, filters, file_format)
+		path = frappe.get_doc("File", file_name).get_full_path()
+		self.addCleanup(os.remove, path)
+		return path
+
+	def test_csv_export(self):
+		path = self.export({"date": getdate()})
+		with open(path, encoding="utf-8") as f:
+			rows = list(csv.reader(f))
+
+		self.assertEqual(rows[0], HEADER)
+		self.assertIn(self.get_expected_row(), rows[1:])
+
+	def test_excel_export(self):
+		from openpyxl import load_workbook
+
+		path = self.export({"date": getdate()}, file_format="Excel")
+		sheet = load_workbook(path, read_only=True).worksheets[0]
+		rows = [[value or "" for value in row] for row in sheet.iter_rows(values_only=True)]
+
+		self.assertEqual(sheet.title, REPORT_NAME)
+		self.assertEqual(rows[0], HEADER)
+		self.assertIn(self.get_expected_row(), rows[1:])
+
+	def test_failed_export(self):
+		files_path = frappe.get_site_path("private", "files")
+		files_before = set(os.listdir(files_path))
+		file_count = frappe.db.count(
+			"File", {"attached_to_doctype": "Report", "attached_to_name": REPORT_NAME}
+		)
+
+		# the report requires a date, so its row generator raises
+		with patch("frappe.publish_realtime") as publish_realtime:
+			self.assertIsNone(build_report_export(REPORT_NAME, {}))
+
+		self.assertEqual(set(os.listdir(files_path)), files_before)
+		self.assertEqual(
+			frappe.db.count(
+				"File", {"attached_to_doctype": "Report", "attached_to_name": REPORT_NAME}
+			),
+			file_count,
+		)
+		self.assertTrue(frappe.db.exists("Error Log", {"reference_name": REPORT_NAME}))
+		publish_realtime.assert_any_call(
+			"report_export_failed", {"report_name": REPORT_NAME}, user=frappe.session.user
+		)
@@ -1,7 +1,11 @@
 # Copyright (c) 2015, Frappe Technologies and contributors
 
+import re
+
 import frappe
 from frappe import _
+from frappe.model.naming import parse_naming_series
+from frappe.utils import cint, getdate, to_timedelta
 
 
 class OverlapError(frappe.ValidationError):
@@ -33,28 +37,141 @@ def get_overlap_for(doc, doctype, fieldname, value=None):
 	:param fieldname: Checks Overlap for this field
 	"""
 
-	existing = frappe.db.sql(
-		"""select name, from_time, to_time from `tab{0}`
-		where `{1}`=%(val)s and schedule_date = %(schedule_date)s and
-		(
-			(from_time > %(from_time)s and from_time < %(to_time)s) or
-			(to_time > %(from_time)s and to_time < %(to_time)s) or
-			(%(from_time)s > from_time and %(from_time)s < to_time) or
-			(%(from_time)s = from_time and %(to_time)s = to_time))
-		and name!=%(name)s and docstatus!=2""".format(
-			doctype, fieldname
+	slot = frappe._dict(
+		name=doc.name,
+		schedule_date=doc.schedule_date,
+		from_time=doc.from_time,
+		to_time=doc.to_time,
+	)
+	slot[fieldname] = value or doc.get(fieldname)
+
+	conflicts = get_overlaps([slot], doctype, (fieldname,)).get(0)
+	return frappe._dict(name=conflicts[0].conflict) if conflicts else None
+
+
+OVERLAP_FIELDS = ("room", "instructor", "student_group")
+
+
+def get_overlaps(slots, doctype="Course Schedule", fields=OVERLAP_FIELDS):
+	"""Returns a conflict map for a batch of candidate slots.
+
+	Each slot is a dict with `schedule_date`, `from_time`, `to_time`, an optional
+	`name` (ignored when matching existing records) and a value for every field
+	to check. Slots are checked against existing records of `doctype` with one
+	query per field and against each other.
+
+	:param slots: List of candidate slots
+	:param doctype: Doctype holding the existing schedules
+	:param fields: Fields on which two overlapping slots conflict
+	:return: `{slot index: [{fieldname, value, conflict, candidate}]}`, where
+	        `conflict` is the conflicting record name or `candidate` the index
+	        of the conflicting slot
+	"""
+	slots = [
+		frappe._dict(
+			slot,
+			schedule_date=getdate(slot.get("schedule_date")),
+			from_time=to_timedelta(slot.get("from_time")),
+			to_time=to_timedelta(slot.get("to_time")),
+		)
+		for slot in slots
+	]
+	meta = frappe.get_meta(doctype)
+	conflicts = {}
+
+	def add_conflict(idx, fieldname, value, conflict=None, candidate=None):
+		conflicts.setdefault(idx, []).append(
+			frappe._dict(fieldname=fieldname, value=value, conflict=conflict, candidate=candidate)
+		)
+
+	for fieldname in fields:
+		if not meta.has_field(fieldname):
+			continue
+
+		candidates = {}
+		for idx, slot in enumerate(slots):
+			if slot.get(fieldname):
+				candidates.setdefault((slot[fieldname], slot.schedule_date), []).append(idx)
+
+		if not candidates:
+			continue
+
+		existing = {}
+		for d in get_scheduled_slots(doctype, fieldname, candidates):
+			existing.setdefault((d.value, d.schedule_date), []).append(d)
+
+		for key, indexes in candidates.items():
+			for i, idx in enumerate(indexes):
+				slot = slots[idx]
+				for d in existing.get(key, []):
+					if d.name != slot.get("name") and slots_overlap(slot, d):
+						add_conflict(idx, fieldname, key[0], conflict=d.name)
+
+				for other in indexes[i + 1 :]:
+					if slots_overlap(slot, slots[other]):
+						add_conflict(idx, fieldname, key[0], candidate=other)
+						add_conflict(other, fieldname, key[0], candidate=idx)
+
+	return conflicts
+
+
+def get_scheduled_slots(doctype, fieldname, candidates):
+	"""Returns non-cancelled records of `doctype` sharing a field value and date with any candidate"""
+	values = list({value for value, schedule_date in candidates})
+	dates = list({schedule_date for value, schedule_date in candidates})
+
+	return frappe.db.sql(
+		"""select name, `{0}` as value, schedule_date, from_time, to_time
+		from `tab{1}`
+		where `{0}` in %(values)s and schedule_date in %(dates)s and docstatus!=2""".format(
+			fieldname, doctype
 		),
-		{
-			"schedule_date": doc.schedule_date,
-			"val": value or doc.get(fieldname),
-			"from_time": doc.from_time,
-			"to_time": doc.to_time,
-			"name": doc.name or "No Name",
-		},
+		{"values": values, "dates": dates},
 		as_dict=True,
 	)
 
-	return existing[0] if existing else None
+
+def slots_overlap(a, b):
+	"""Returns True if two slots on the same day share any time"""
+	return to_timedelta(a.from_time) < to_timedelta(b.to_time) and to_timedelta(
+		b.from_time
+	) < to_timedelta(a.to_time)
+
+
+def make_series_names(naming_series, count):
+	"""Reserves `count` consecutive names from a naming series with one update.
+
+	As in `frappe.model.naming`, the counter is kept under the parsed part of the
+	series before its `#` run and numbers are padded to the length of that run, or
+	to five digits if the series has none.
+	"""
+	series, hashes, suffix = naming_series, "#####", ""
+	match = re.search(r"#+", naming_series)
+	if match:
+		series, hashes = naming_series[: match.start()], match.group()
+		suffix = naming_series[match.end() :]
+
+	prefix = parse_naming_series(series)
+	suffix = parse_naming_series(suffix) if suffix.strip(".") else ""
+	current = frappe.db.sql(
+		"select `current` from `tabSeries` where `name`=%s for update", prefix
+	)
+	if current:
+		current = cint(current[0][0])
+		frappe.db.sql(
+			"update `tabSeries` set `current` = `current` + %s where `name`=%s",
+			(count, prefix),
+		)
+	else:
+		current = 0
+		frappe.db.sql(
+			"insert into `tabSeries` (`name`, `current`) values (%s, %s)", (prefix, count)
+		)
+
+	return [
+		"{0}{1}{2}".format(prefix, str(current + i).zfill(len(hashes)), suffix)
+		for i in range(1, count + 1)
+	]
 
 
 def validate_duplicate_student(students):
@@ -73,20 +190,114 @@ def validate_duplicate_student(students):
 
 
 # LMS Utils
+LMS_CONTEXT_TTL = 60
+SUPER_ACCESS_ROLES = {
+	"Administrator",
+	"Instructor",
+	"Education Manager",
+	"System Manager",
+	"Academic User",
+}
+
+
+class LMSContext:
+	"""Session student, roles and enrollments shared by the LMS helpers.
+
+	Resolved at most once per request and kept in the site cache for `LMS_CONTEXT_TTL`
+	seconds per user. The Student document itself is only loaded when asked for.
+	"""
+
+	def __init__(self, user):
+		self.user = user
+		data = frappe.cache().get_value(f"lms_context|{user}")
+		if data is None:
+			data = self.load()
+			frappe.cache().set_value(f"lms_context|{user}", data, expires_in_sec=LMS_CONTEXT_TTL)
+
+		self.student_name = data["student"]
+		self.roles = set(data["roles"])
+		self.course_enrollments = data["course_enrollments"]
+		self.program_enrollments = data["program_enrollments"]
+		self._student = None
+
+	def load(self):
+		data = {
+			"student": None,
+			"roles": frappe.get_roles(self.user),
+			"course_enrollments": {},
+			"program_enrollments": {},
+		}
+		if self.user in ("Administrator", "Guest"):
+			return data
+
+		students = frappe.get_all("Student", {"student_email_id": self.user}, pluck="name")
+		if not students:
+			return data
+
+		data["student"] = students[0]
+		for d in frappe.get_all(
+			"Course Enrollment", filters={"student": data["student"]}, fields=["name", "course"]
+		):
+			data["course_enrollments"].setdefault(d.course, d.name)
+		for d in frappe.get_all(
+			"Program Enrollment",
+			filters={"student": data["student"], "docstatus": 1},
+			fields=["name", "program"],
+		):
+			data["program_enrollments"].setdefault(d.program, d.name)
+		return data
+
+	@property
+	def student(self):
+		if self.student_name and not self._student:
+			try:
+				self._student = frappe.get_doc("Student", self.student_name)
+			except frappe.DoesNotExistError:
+				self.student_name = None
+		return self._student
+
+	@property
+	def has_super_access(self):
+		return bool(self.roles & SUPER_ACCESS_ROLES)
+
+
+def get_lms_context():
+	"""Returns the `LMSContext` of the session user, resolving it once per request."""
+	context = getattr(frappe.local, "lms_context", None)
+	if not context or context.user != frappe.session.user:
+		context = frappe.local.lms_context = LMSContext(frappe.session.user)
+	return context
+
+
+def clear_lms_context(user=None):
+	"""Drops the cached `LMSContext` of a user, the session user by default."""
+	user = user or frappe.session.user
+	frappe.cache().delete_value(f"lms_context|{user}")
+	if getattr(frappe.local, "lms_context", None) and frappe.local.lms_context.user == user:
+		frappe.local.lms_context = None
+
+
+def clear_lms_context_for_students(students):
+	"""Drops the cached `LMSContext` of the users of the given Students, e.g. after they
+	are enrolled in a course or program."""
+	for user in frappe.get_all(
+		"Student", filters={"name": ("in", list(students))}, pluck="student_email_id"
+	):
+		if user:
+			clear_lms_context(user)
+
+
+def clear_lms_context_for_user(doc, method=None):
+	clear_lms_context(doc.name)
+
+
 def get_current_student():
 	"""Returns current student from frappe.session.user
 
 	Returns:
 	        object: Student Document
 	"""
-	email = frappe.session.user
-	if email in ("Administrator", "Guest"):
-		return None
-	try:
-		student_id = frappe.get_all("Student", {"student_email_id": email}, ["name"])[0].name
-		return frappe.get_doc("Student", student_id)
-	except (IndexError, frappe.DoesNotExistError):
-		return None
+	return get_lms_context().student
 
 
 def get_enrollment(master, document, student):
@@ -100,6 +311,13 @@ def get_enrollment(master, document, student):
 	Returns:
 	        string: Enrollment Name if exists else returns empty string
 	"""
+	context = get_lms_context()
+	if student and student == context.student_name:
+		if master == "program":
+			return context.program_enrollments.get(document)
+		if master == "course":
+			return context.course_enrollments.get(document)
+
 	if master == "program":
 		enrollments = frappe.get_all(
 			"Program Enrollment",
@@ -142,6 +360,7 @@ def enroll_in_program(program_name, student=None):
 		student = get_current_student()
 		if not student:
 			student = create_student_from_current_user()
+			clear_lms_context()
 
 	# Check if student is already enrolled in program
 	enrollment = get_enrollment("program", program_name, student.name)
@@ -155,6 +374,7 @@ def enroll_in_program(program_name, student=None):
 
 	# Enroll in program
 	program_enrollment = student.enroll_in_program(program_name)
+	clear_lms_context()
 	return program_enrollment.name
 
 
@@ -164,18 +384,7 @@ def has_super_access():
 	Returns:
 	        bool: true if user has access to all lms content
 	"""
-	current_user = frappe.get_doc("User", frappe.session.user)
-	roles = set([role.role for role in current_user.roles])
-	return bool(
-		roles
-		& {
-			"Administrator",
-			"Instructor",
-			"Education Manager",
-			"System Manager",
-			"Academic User",
-		}
-	)
+	return get_lms_context().has_super_access
 
 
 @frappe.whitelist()
@@ -223,24 +432,19 @@ def evaluate_quiz(quiz_response, quiz_name, course, program, time_taken):
 
 @frappe.whitelist()
 def get_quiz(quiz_name, course):
-	try:
-		quiz = frappe.get_doc("Quiz", quiz_name)
-		questions = quiz.get_questions()
-	except Exception:
+	from education.education.doctype.quiz.quiz import get_quiz_payload
+
+	quiz = frappe.db.get_value(
+		"Quiz",
+		quiz_name,
+		["name", "modified", "is_time_bound", "duration", "max_attempts", "grading_basis"],
+		as_dict=True,
+	)
+	if not quiz:
 		frappe.throw(_("Quiz {0} does not exist").format(quiz_name), frappe.DoesNotExistError)
 		return None
 
-	questions = [
-		{
-			"name": question.name,
-			"question": question.question,
-			"type": question.question_type,
-			"options": [
-				{"name": option.name, "option": option.option} for option in question.options
-			],
-		}
-		for question in questions
-	]
+	questions = get_quiz_payload(quiz.name, quiz.modified)
 
 	if has_super_access():
 		return {
@@ -250,9 +454,8 @@ def get_quiz(quiz_name, course):
 			"duration": quiz.duration,
 		}
 
-	student = get_current_student()
-	course_enrollment = get_enrollment("course", course, student.name)
-	status, score, result, time_taken = check_quiz_completion(quiz, course_enrollment)
+	course_enrollment = get_enrollment("course", course, get_lms_context().student_name)
+	status, score, result, time_taken = get_quiz_attempt_summary(quiz, course_enrollment)
 	return {
 		"questions": questions,
 		"activity": {
@@ -266,26 +469,57 @@ def get_quiz(quiz_name, course):
 	}
 
 
+def get_quiz_attempt_summary(quiz, enrollment):
+	"""Returns status, score, result and time taken of a quiz in a course enrollment,
+	like `get_quiz_completion`, with one grouped query over its Quiz Activity.
+
+	The attempt count is aggregated over all attempts and joined to the attempt that
+	counts: the latest one, or the highest scoring one (latest first on ties) when the
+	quiz is graded on the Last Highest Score.
+	"""
+	attempts, score, result, time_taken = 0, None, None, None
+	if enrollment:
+		order_by = "modified desc"
+		if quiz.grading_basis == "Last Highest Score":
+			order_by = "cast(score as decimal(21, 9)) desc, modified desc"
+
+		summary = frappe.db.sql(
+			"""
+			select count(qa.name), graded.score, graded.status, graded.time_taken
+			from `tabQuiz Activity` qa
+			inner join (
+				select score, status, time_taken from `tabQuiz Activity`
+				where enrollment = %(enrollment)s and quiz = %(quiz)s
+				order by {order_by}
+				limit 1
+			) graded
+			where qa.enrollment = %(enrollment)s and qa.quiz = %(quiz)s
+			group by graded.score, graded.status, graded.time_taken""".format(
+				order_by=order_by
+			),
+			{"enrollment": enrollment, "quiz": quiz.name},
+		)
+		if summary:
+			attempts, score, result, time_taken = summary[0]
+
+	status = False if quiz.max_attempts == 0 else bool(attempts >= quiz.max_attempts)
+	if result == "Pass":
+		status = True
+	return status, score, result, time_taken
+
+
 def get_topic_progress(topic, course_name, program):
 	"""
 	Return the porgress of a course in a program as well as the content to continue from.
 	        :param topic_name:
 	        :param course_name:
 	"""
-	student = get_current_student()
+	student = get_lms_context().student_name
 	if not student:
 		return None
-	course_enrollment = get_or_create_course_enrollment(course_name, program)
-	progress = student.get_topic_progress(course_enrollment.name, topic)
-	if not progress:
-		return None
-	count = sum([activity["is_complete"] for activity in progress])
-	if count == 0:
-		return {"completed": False, "started": False}
-	elif count == len(progress):
-		return {"completed": True, "started": True}
-	elif count < len(progress):
-		return {"completed": False, "started": True}
+	return ProgressEngine(get_name(program), student).get_topic_progress(
+		course_name, topic.name
+	)
 
 
 def get_course_progress(course, program):
@@ -294,75 +528,202 @@ def get_course_progress(course, program):
 	        :param topic_name:
 	        :param course_name:
 	"""
-	course_progress = []
-	for course_topic in course.topics:
-		topic = frappe.get_doc("Topic", course_topic.topic)
-		progress = get_topic_progress(topic, course.name, program)
-		if progress:
-			course_progress.append(progress)
-	if course_progress:
-		number_of_completed_topics = sum(
-			[activity["completed"] for activity in course_progress]
-		)
-		total_topics = len(course_progress)
-		if total_topics == 1:
-			return course_progress[0]
-		if number_of_completed_topics == 0:
-			return {"completed": False, "started": False}
-		if number_of_completed_topics == total_topics:
-			return {"completed": True, "started": True}
-		if number_of_completed_topics < total_topics:
-			return {"completed": False, "started": True}
-
-	return None
+	student = get_lms_context().student_name
+	if not student:
+		return None
+	return ProgressEngine(get_name(program), student).get_course_progress(course.name)
 
 
 def get_program_progress(program):
-	program_progress = []
 	if not program.courses:
 		return None
-	for program_course in program.courses:
-		course = frappe.get_doc("Course", program_course.course)
-		progress = get_course_progress(course, program.name)
-		if progress:
-			progress["name"] = course.name
-			progress["course"] = course.course_name
-			program_progress.append(progress)
+	student = get_lms_context().student_name
+	if not student:
+		return None
+	return ProgressEngine(program.name, student).get_program_progress()
 
-	if program_progress:
-		return program_progress
 
-	return None
+def get_program_completion(program):
+	student = get_lms_context().student_name
+	if not student:
+		return 0
+	return ProgressEngine(program.name, student).get_program_completion()
 
 
-def get_program_completion(program):
-	topics = frappe.db.sql(
-		"""select `tabCourse Topic`.topic, `tabCourse Topic`.parent
-	from `tabCourse Topic`,
-		 `tabProgram Course`
-	where `tabCourse Topic`.parent = `tabProgram Course`.course
-			and `tabProgram Course`.parent = %s""",
-		program.name,
-	)
+def get_name(doc):
+	return doc if isinstance(doc, str) else doc.name
+
 
-	progress = []
-	for topic in topics:
-		topic_doc = frappe.get_doc("Topic", topic[0])
-		topic_progress = get_topic_progress(topic_doc, topic[1], program.name)
-		if topic_progress:
-			progress.append(topic_progress)
+class ProgressEngine:
+	"""Computes the LMS progress of a student in a program in memory.
 
-	if progress:
-		number_of_completed_topics = sum(
-			[activity["completed"] for activity in progress if activity]
+	The program structure, the student's course enrollments, their content activities
+	and quiz attempts are loaded with a fixed number of queries, after which topic,
+	course and program progress are derived without further database access. Courses
+	without an enrollment count as not started.
+	"""
+
+	def __init__(self, program, student):
+		self.program = program
+		self.student = student
+		self.load_structure()
+		self.load_activities()
+
+	def load_structure(self):
+		rows = frappe.db.sql(
+			"""select pc.course, pc.course_name, ct.topic, tc.content_type, tc.content
+			from `tabProgram Course` pc
+			inner join `tabCourse Topic` ct on ct.parent = pc.course and ct.parenttype = 'Course'
+			left join `tabTopic Content` tc on tc.parent = ct.topic and tc.parenttype = 'Topic'
+			where pc.parent = %s and pc.parenttype = 'Program'
+			order by pc.idx, ct.idx, tc.idx""",
+			self.program,
+			as_dict=True,
 		)
-		total_topics = len(progress)
-		try:
-			return int((float(number_of_completed_topics) / total_topics) * 100)
-		except ZeroDivisionError:
-			return 0
 
-	return 0
+		# {course: {topic: [(content_type, content)]}} in program order
+		self.courses = {}
+		self.course_names = {}
+		for d in rows:
+			self.course_names[d.course] = d.course_name
+			topics = self.courses.setdefault(d.course, {})
+			contents = topics.setdefault(d.topic, [])
+			if d.content:
+				contents.append((d.content_type, d.content))
+
+	def load_activities(self):
+		context = get_lms_context()
+		if self.student == context.student_name:
+			self.enrollments = {
+				course: enrollment
+				for course, enrollment in context.course_enrollments.items()
+				if course in self.courses
+			}
+		else:
+			self.enrollments = {}
+			for d in frappe.get_all(
+				"Course Enrollment",
+				filters={"student": self.student, "course": ("in", list(self.courses) or [""])},
+				fields=["name", "course"],
+			):
+				self.enrollments.setdefault(d.course, d.name)
+
+		enrollments = list(self.enrollments.values()) or [""]
+		self.completed_contents = {
+			(d.enrollment, d.content_type, d.content)
+			for d in frappe.get_all(
+				"Course Activity",
+				filters={"enrollment": ("in", enrollments)},
+				fields=["enrollment", "content_type", "content"],
+			)
+		}
+
+		self.quiz_attempts = {}
+		for d in frappe.get_all(
+			"Quiz Activity",
+			filters={"enrollment": ("in", enrollments)},
+			fields=["enrollment", "quiz", "name", "activity_date", "score", "status", "time_taken"],
+			order_by="modified desc",
+		):
+			self.quiz_attempts.setdefault((d.enrollment, d.quiz), []).append(d)
+
+		quizzes = {
+			content
+			for topics in self.courses.values()
+			for contents in topics.values()
+			for content_type, content in contents
+			if content_type == "Quiz"
+		}
+		self.quizzes = {
+			d.name: d
+			for d in frappe.get_all(
+				"Quiz",
+				filters={"name": ("in", list(quizzes) or [""])},
+				fields=["name", "max_attempts", "grading_basis"],
+			)
+		}
+
+	def get_content_progress(self, course, topic):
+		"""Returns the same structure as `Student.get_topic_progress`."""
+		enrollment = self.enrollments.get(course)
+		progress = []
+		for content_type, content in self.courses.get(course, {}).get(topic, []):
+			if content_type in ("Article", "Video"):
+				progress.append(
+					{
+						"content": content,
+						"content_type": content_type,
+						"is_complete": (enrollment, content_type, content) in self.completed_contents,
+					}
+				)
+			elif content_type == "Quiz" and content in self.quizzes:
+				status, score, result, time_taken = get_quiz_completion(
+					self.quizzes[content], self.quiz_attempts.get((enrollment, content), [])
+				)
+				progress.append(
+					{
+						"content": content,
+						"content_type": content_type,
+						"is_complete": status,
+						"score": score,
+						"result": result,
+					}
+				)
+		return progress
+
+	def get_topic_progress(self, course, topic):
+		return summarize_progress(
+			[activity["is_complete"] for activity in self.get_content_progress(course, topic)]
+		)
+
+	def get_course_progress(self, course):
+		course_progress = []
+		for topic in self.courses.get(course, {}):
+			progress = self.get_topic_progress(course, topic)
+			if progress:
+				course_progress.append(progress)
+
+		if len(course_progress) == 1:
+			return course_progress[0]
+		return summarize_progress([activity["completed"] for activity in course_progress])
+
+	def get_program_progress(self):
+		program_progress = []
+		for course in self.courses:
+			progress = self.get_course_progress(course)
+			if progress:
+				progress["name"] = course
+				progress["course"] = self.course_names.get(course)
+				program_progress.append(progress)
+
+		return program_progress or None
+
+	def get_program_completion(self):
+		progress = []
+		for course, topics in self.courses.items():
+			for topic in topics:
+				topic_progress = self.get_topic_progress(course, topic)
+				if topic_progress:
+					progress.append(topic_progress)
+
+		if progress:
+			number_of_completed_topics = sum([activity["completed"] for activity in progress])
+			return int((float(number_of_completed_topics) / len(progress)) * 100)
+
+		return 0
+
+
+def summarize_progress(completed):
+	"""Returns the started/completed state for a list of completion flags."""
+	if not completed:
+		return None
+	count = sum(completed)
+	if count == 0:
+		return {"completed": False, "started": False}
+	elif count == len(completed):
+		return {"completed": True, "started": True}
+	else:
+		return {"completed": False, "started": True}
 
 
 def create_student_from_current_user():
@@ -390,10 +751,12 @@ def get_or_create_course_enrollment(course, program):
 		if not program_enrollment:
 			frappe.throw(_("You are not enrolled in program {0}").format(program))
 			return
-		return student.enroll_in_course(
+		course_enrollment = student.enroll_in_course(
 			course_name=course,
-			program_enrollment=get_enrollment("program", program.name, student.name),
+			program_enrollment=program_enrollment,
 		)
+		clear_lms_context()
+		return course_enrollment
 	else:
 		return frappe.get_doc("Course Enrollment", course_enrollment)
 
@@ -419,6 +782,11 @@ def check_quiz_completion(quiz, enrollment_name):
 		filters={"enrollment": enrollment_name, "quiz": quiz.name},
 		fields=["name", "activity_date", "score", "status", "time_taken"],
 	)
+	return get_quiz_completion(quiz, attempts)
+
+
+def get_quiz_completion(quiz, attempts):
+	"""Returns status, score, result and time taken of a quiz from its attempts, latest first."""
 	status = False if quiz.max_attempts == 0 else bool(len(attempts) >= quiz.max_attempts)
 	score = None
 	result = None
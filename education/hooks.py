@@ -212,6 +212,12 @@ doc_events = {
     "Room": {
         "after_insert": "education.custom_scripts.room_utils.create_sharepoint_folder"
     },
+	"User": {
+		"on_update": [
+			"education.education.api.clear_portal_bootstrap_for_user",
+			"education.education.utils.clear_lms_context_for_user",
+		],
+	},
 	"Student": {
         #"on_update": "education.custom_scripts.moodle_sync.sync_moodle_user_on_student_update",
         #"on_trash": "education.custom_scripts.moodle_sync.delete_moodle_user_on_student_deletion"
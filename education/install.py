@@ -11,6 +11,7 @@ def after_install():
 	create_invoice_permissions()
 	create_custom_fields(get_custom_fields())
 	create_permissions(get_permissions())
+	create_overlap_indexes()
 
 
 def setup_fixtures():
@@ -148,3 +149,18 @@ def get_custom_fields():
 			},
 		],
 	}
+
+
+def create_overlap_indexes():
+	"""Adds composite indexes backing the schedule overlap checks"""
+	from education.education.utils import OVERLAP_FIELDS
+
+	overlap_fields = {
+		"Course Schedule": OVERLAP_FIELDS,
+		"Assessment Plan": OVERLAP_FIELDS + ("supervisor",),
+	}
+	for doctype, fields in overlap_fields.items():
+		meta = frappe.get_meta(doctype)
+		for fieldname in fields:
+			if meta.has_field(fieldname):
+				frappe.db.add_index(doctype, [fieldname, "schedule_date"])
@@ -0,0 +1,5 @@
+from education.install import create_overlap_indexes
+
+
+def execute():
+	create_overlap_indexes()
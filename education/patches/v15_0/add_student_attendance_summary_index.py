@@ -0,0 +1,7 @@
+from education.education.doctype.student_attendance.student_attendance import (
+	on_doctype_update,
+)
+
+
+def execute():
+	on_doctype_update()
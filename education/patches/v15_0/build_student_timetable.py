@@ -0,0 +1,10 @@
+import frappe
+
+from education.education.doctype.student_timetable_entry.student_timetable_entry import (
+	update_timetable_for_group,
+)
+
+
+def execute():
+	for student_group in frappe.get_all("Student Group", pluck="name"):
+		update_timetable_for_group(student_group)
@@ -0,0 +1,68 @@
+frappe.provide("education.course_schedule");
+
+// Client side counterpart of `compress_course_schedule_events`: expands weekly
+// series into the flat events served by `get_course_schedule_events`.
+education.course_schedule.expand_series = function (series) {
+	const events = [];
+	const fields = ["course", "color", "room", "student_group", "instructor"];
+
+	(series || []).forEach((s) => {
+		const exceptions = new Set(s.exceptions || []);
+		let date = s.start;
+		let idx = 0;
+		while (date <= s.until) {
+			if (!exceptions.has(date)) {
+				const event = {
+					name: s.names[idx++],
+					from_time: `${date} ${s.start_time}`,
+					to_time: `${date} ${s.end_time}`,
+					allDay: 0,
+				};
+				fields.forEach((f) => {
+					if (f in s) event[f] = s[f];
+				});
+				events.push(event);
+			}
+			date = frappe.datetime.add_days(date, 7);
+		}
+	});
+
+	return events;
+};
+
+// Calendar view hooks: `get_args` asks for weekly series along with the etag of
+// the copy already held for the window, and `prepare_events` expands the series
+// or reuses that copy when the server reports it as not modified.
+education.course_schedule._cache = {};
+
+education.course_schedule.get_calendar_args = function (calendar, start, end) {
+	const args = frappe.views.Calendar.prototype.get_args.call(calendar, start, end);
+	const key = JSON.stringify([args.start, args.end, args.filters || null]);
+	const cached = education.course_schedule._cache[key];
+
+	calendar.course_schedule_window = key;
+	args.compress = 1;
+	if (cached) {
+		args.etag = cached.etag;
+	}
+	return args;
+};
+
+education.course_schedule.prepare_calendar_events = function (calendar, data) {
+	const key = calendar.course_schedule_window;
+	const cached = education.course_schedule._cache[key];
+
+	let events;
+	if (data.not_modified && cached) {
+		events = cached.events;
+	} else {
+		events = education.course_schedule.expand_series(data.series);
+		education.course_schedule._cache[key] = { etag: data.etag, events: events };
+	}
+
+	// the calendar mutates the events it renders, keep the cached copy intact
+	return frappe.views.Calendar.prototype.prepare_events.call(
+		calendar,
+		events.map((event) => Object.assign({}, event))
+	);
+};
@@ -1 +1,3 @@
 import "./assessment_result_tool.html";
+import "./course_schedule_events.js";
+import "./report_export.js";
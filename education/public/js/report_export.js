@@ -0,0 +1,59 @@
+frappe.provide("education.report_export");
+
+// Adds an "Export in Background" button to reports that implement `iter_execute`.
+// The file is written by `education.education.report_export.export_report` and
+// announced over realtime once it is attached to the Report, or when it fails.
+education.report_export.setup = function (report) {
+	report.page.add_inner_button(__("Export in Background"), function () {
+		let filters = report.get_values();
+		if (!filters) return;
+
+		frappe.prompt(
+			{
+				fieldname: "file_format",
+				label: __("Format"),
+				fieldtype: "Select",
+				options: ["CSV", "Excel"],
+				default: "CSV",
+				reqd: 1,
+			},
+			(values) => {
+				frappe.call({
+					method: "education.education.report_export.export_report",
+					args: {
+						report_name: report.report_name,
+						filters: filters,
+						file_format: values.file_format,
+					},
+				});
+			},
+			__("Export {0}", [__(report.report_name)]),
+			__("Export")
+		);
+	});
+
+	if (!education.report_export.listening) {
+		education.report_export.listening = true;
+		frappe.realtime.on("report_export_ready", (data) => {
+			frappe.msgprint({
+				title: __("Export Ready"),
+				indicator: "green",
+				message: __("Export of {0} is ready: {1}", [
+					__(data.report_name),
+					`<a href="${encodeURI(data.file_url)}" target="_blank">${frappe.utils.escape_html(
+						data.file_name
+					)}</a>`,
+				]),
+			});
+		});
+		frappe.realtime.on("report_export_failed", (data) => {
+			frappe.msgprint({
+				title: __("Export Failed"),
+				indicator: "red",
+				message: __("Export of {0} failed, see the Error Log for details", [
+					__(data.report_name),
+				]),
+			});
+		});
+	}
+};
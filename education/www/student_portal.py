@@ -1,10 +1,7 @@
-import frappe
+from education.education.settings import get_education_settings
 
 
 def get_context(context):
-	abbr = frappe.db.get_single_value(
-		"Education Settings", "school_college_name_abbreviation"
-	)
-	logo = frappe.db.get_single_value("Education Settings", "school_college_logo")
-	context.abbr = abbr or "Frappe Education"
-	context.logo = logo or "/favicon.png"
+	settings = get_education_settings()
+	context.abbr = settings.school_college_name_abbreviation or "Frappe Education"
+	context.logo = settings.school_college_logo or "/favicon.png"
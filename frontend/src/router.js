@@ -1,5 +1,4 @@
 import { createRouter, createWebHistory } from 'vue-router'
-import { usersStore } from '@/stores/user'
 import { sessionStore } from '@/stores/session'
 import { studentStore } from '@/stores/student'
 
@@ -41,18 +40,17 @@ let router = createRouter({
 
 router.beforeEach(async (to, from) => {
   const { isLoggedIn, user: sessionUser } = sessionStore()
-  const { user } = usersStore()
-  const { student } = studentStore()
+  const { student, studentInfo } = studentStore()
 
   if (!isLoggedIn) {
     window.location.href = '/login'
     return await next(false)
   }
 
-  if (user.data.length === 0) {
-    await user.reload()
+  // studentInfo is only set once the bootstrap call of this session succeeded
+  if (!studentInfo.name) {
+    await student.reload()
   }
-  await student.reload()
 
 })
 
@@ -1,12 +1,10 @@
 import { defineStore } from 'pinia'
 import { createResource } from 'frappe-ui'
-import { usersStore } from '@/stores/user'
 import router from '@/router'
 import { ref, computed } from 'vue'
 import {studentStore} from '@/stores/student'
 
 export const sessionStore = defineStore('education-session', () => {
-	const { user:currentUser } = usersStore()
 	const { student } = studentStore()
 
 	function sessionUser() {
@@ -26,8 +24,6 @@ export const sessionStore = defineStore('education-session', () => {
 			throw new Error('Invalid email or password')
 		},
 		onSuccess() {
-			currentUser.reload()
-			sessionUser.reload()
 			student.reload()
 			user.value = sessionUser()
 			login.reset()
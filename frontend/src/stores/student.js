@@ -1,38 +1,37 @@
 import { defineStore } from 'pinia'
 import { ref } from 'vue'
 import { createResource } from 'frappe-ui';
+import router from "@/router"
 
 export const studentStore = defineStore('education-student', () => {
 
 	const studentInfo = ref({})
 	const currentProgram = ref({})
 	const studentGroups = ref([])
+	const school = ref({})
 
+	// one call at startup returns the user, student, current enrollment,
+	// student groups and school branding; the user store reads from it too
 	const student = createResource({
-		url: 'education.education.api.get_student_info',
-		onSuccess(info) {
-			if (!info) {
+		url: 'education.education.api.get_portal_bootstrap',
+		onSuccess(data) {
+			if (!data.student) {
 				window.location.href = "/app"
+				return
 			}
-			currentProgram.value = info.current_program 
-			// remove current_program from info
-			delete info.current_program
-			studentGroups.value = info.student_groups
-			delete info.student_groups
-			studentInfo.value = info
+			currentProgram.value = data.current_program
+			studentGroups.value = data.student_groups
+			studentInfo.value = data.student
+			school.value = data.school
 		},
-		onError(err) {
-			console.error(err)
+		onError(error) {
+			console.error(error)
+			if (error && error.exc_type === 'AuthenticationError') {
+				router.push('/login')
+			}
 		}
 	})
 
-	// const s = createDocumentResource({
-	// 	doctype:"Student",
-	// 	whitelist: {
-	// 		'get_student_info': get_student_info
-	// 	}
-	// })
-
 	function getStudentInfo(){
 		return studentInfo
 	}
@@ -44,5 +43,9 @@ export const studentStore = defineStore('education-student', () => {
 		return studentGroups
 	}
 
-	return { student ,studentInfo, currentProgram , studentGroups, getStudentInfo, getCurrentProgram, getStudentGroups }
+	function getSchool(){
+		return school
+	}
+
+	return { student ,studentInfo, currentProgram , studentGroups, school, getStudentInfo, getCurrentProgram, getStudentGroups, getSchool }
 })
@@ -1,19 +1,14 @@
 import { defineStore } from 'pinia'
-import { createResource } from 'frappe-ui'
-import router from "@/router"
+import { computed, reactive } from 'vue'
+import { studentStore } from '@/stores/student'
 
 export const usersStore = defineStore('education-users', () => {
-	const user = createResource({
-		url: 'education.education.api.get_user_info',
-		cache: "User",
-		initialData: [],
-		onError(error) {
-			console.log(error)
-			console.log(error.exc_type)
-			if (error && error.exc_type === 'AuthenticationError') {
-				router.push('/login')
-			}
-		},
+	const { student } = studentStore()
+
+	// the session user comes with the portal bootstrap payload
+	const user = reactive({
+		data: computed(() => student.data?.user || []),
+		reload: () => student.reload(),
 	})
 
 	return {